@@ -0,0 +1,37 @@
+"""add documents status/filename index
+
+Revision ID: 3f2a9c7d1e45
+Revises: 601669f948cf
+Create Date: 2026-10-15 10:12:08.412093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2a9c7d1e45"
+down_revision: Union[str, Sequence[str], None] = "601669f948cf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - index documents by status for list/sync queries."""
+    # Serves status filters and the filename-sorted listing within a status
+    op.create_index(
+        "ix_documents_status_filename",
+        "documents",
+        ["status", "filename"],
+        unique=False,
+    )
+
+    # The primary key already indexes id
+    op.drop_index(op.f("ix_documents_id"), table_name="documents")
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop documents status index."""
+    op.create_index(op.f("ix_documents_id"), "documents", ["id"], unique=False)
+    op.drop_index("ix_documents_status_filename", table_name="documents")
@@ -0,0 +1,32 @@
+"""add documents file stat columns
+
+Revision ID: 8c41d2b7a6f3
+Revises: 3f2a9c7d1e45
+Create Date: 2026-10-15 11:03:41.275519
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41d2b7a6f3"
+down_revision: Union[str, Sequence[str], None] = "3f2a9c7d1e45"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - store file mtime/size to skip rehashing unchanged files."""
+    op.add_column(
+        "documents", sa.Column("file_mtime_ns", sa.BigInteger(), nullable=True)
+    )
+    op.add_column("documents", sa.Column("file_size", sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop file stat columns."""
+    op.drop_column("documents", "file_size")
+    op.drop_column("documents", "file_mtime_ns")
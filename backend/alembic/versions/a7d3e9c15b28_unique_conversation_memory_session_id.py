@@ -0,0 +1,52 @@
+"""unique conversation memory session id
+
+Revision ID: a7d3e9c15b28
+Revises: f4c8b2d6a913
+Create Date: 2026-10-15 17:02:31.418265
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d3e9c15b28"
+down_revision: Union[str, Sequence[str], None] = "f4c8b2d6a913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - one memory record per session."""
+    # Lookups only ever returned one record per session; drop the extras
+    op.execute(
+        sa.text(
+            "DELETE FROM conversation_memories a "
+            "USING conversation_memories b "
+            "WHERE a.session_id = b.session_id AND a.id > b.id"
+        )
+    )
+    op.drop_index(
+        op.f("ix_conversation_memories_session_id"), table_name="conversation_memories"
+    )
+    op.create_index(
+        op.f("ix_conversation_memories_session_id"),
+        "conversation_memories",
+        ["session_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - non-unique session id index."""
+    op.drop_index(
+        op.f("ix_conversation_memories_session_id"), table_name="conversation_memories"
+    )
+    op.create_index(
+        op.f("ix_conversation_memories_session_id"),
+        "conversation_memories",
+        ["session_id"],
+        unique=False,
+    )
@@ -0,0 +1,45 @@
+"""add documents hash algorithm
+
+Revision ID: b5e07a93d2c1
+Revises: 8c41d2b7a6f3
+Create Date: 2026-10-15 13:27:09.614382
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e07a93d2c1"
+down_revision: Union[str, Sequence[str], None] = "8c41d2b7a6f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - record which algorithm produced each file hash.
+
+    Existing rows were hashed with SHA-256; they are upgraded to BLAKE3 on
+    the next sync without being flagged as modified.
+    """
+    op.add_column(
+        "documents",
+        sa.Column(
+            "hash_algorithm",
+            sa.String(length=16),
+            nullable=False,
+            server_default="sha256",
+        ),
+    )
+    op.alter_column("documents", "hash_algorithm", server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop hash algorithm column.
+
+    BLAKE3 hashes left in file_hash no longer match SHA-256, so affected
+    documents will be reported as modified on the next sync.
+    """
+    op.drop_column("documents", "hash_algorithm")
@@ -0,0 +1,56 @@
+"""store chunk embeddings as halfvec
+
+Revision ID: d29f6c8e4b17
+Revises: b5e07a93d2c1
+Create Date: 2026-10-15 14:52:36.180947
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d29f6c8e4b17"
+down_revision: Union[str, Sequence[str], None] = "b5e07a93d2c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - store embeddings as FP16 halfvec (requires pgvector 0.7+)."""
+    op.execute("DROP INDEX IF EXISTS document_chunks_embedding_idx")
+    # Existing vectors are cast in place, no re-embedding needed
+    op.execute(
+        """
+        ALTER TABLE document_chunks
+        ALTER COLUMN embedding TYPE halfvec(1536)
+        USING embedding::halfvec(1536)
+    """
+    )
+    op.execute(
+        """
+        CREATE INDEX document_chunks_embedding_idx
+        ON document_chunks
+        USING hnsw (embedding halfvec_cosine_ops)
+    """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - store embeddings as float32 vector."""
+    op.execute("DROP INDEX IF EXISTS document_chunks_embedding_idx")
+    op.execute(
+        """
+        ALTER TABLE document_chunks
+        ALTER COLUMN embedding TYPE vector(1536)
+        USING embedding::vector(1536)
+    """
+    )
+    op.execute(
+        """
+        CREATE INDEX document_chunks_embedding_idx
+        ON document_chunks
+        USING hnsw (embedding vector_cosine_ops)
+    """
+    )
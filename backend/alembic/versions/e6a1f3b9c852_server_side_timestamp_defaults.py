@@ -0,0 +1,34 @@
+"""server side timestamp defaults
+
+Revision ID: e6a1f3b9c852
+Revises: d29f6c8e4b17
+Create Date: 2026-10-15 15:40:12.508314
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a1f3b9c852"
+down_revision: Union[str, Sequence[str], None] = "d29f6c8e4b17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UTC_NOW = sa.text("timezone('utc', now())")
+
+
+def upgrade() -> None:
+    """Upgrade schema - let the database fill created_at/updated_at."""
+    op.alter_column("documents", "created_at", server_default=UTC_NOW)
+    op.alter_column("documents", "updated_at", server_default=UTC_NOW)
+    op.alter_column("document_chunks", "created_at", server_default=UTC_NOW)
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop timestamp server defaults."""
+    op.alter_column("document_chunks", "created_at", server_default=None)
+    op.alter_column("documents", "updated_at", server_default=None)
+    op.alter_column("documents", "created_at", server_default=None)
@@ -0,0 +1,34 @@
+"""add documents needing reindex index
+
+Revision ID: f4c8b2d6a913
+Revises: e6a1f3b9c852
+Create Date: 2026-10-15 16:18:54.772031
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c8b2d6a913"
+down_revision: Union[str, Sequence[str], None] = "e6a1f3b9c852"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - partial index for documents awaiting reindex."""
+    op.create_index(
+        "ix_documents_needing_reindex",
+        "documents",
+        ["filename"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('new', 'modified')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop partial reindex index."""
+    op.drop_index("ix_documents_needing_reindex", table_name="documents")
@@ -0,0 +1,10 @@
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.repositories.document_repository import DocumentRepository
+
+
+def get_document_repo(db: Session = Depends(get_db)) -> DocumentRepository:
+    """Dependency for DocumentRepository bound to the request's DB session"""
+    return DocumentRepository(db)
@@ -1,10 +1,13 @@
+import asyncio
 import logging
 from datetime import datetime
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.api.deps import get_document_repo
 from app.db import get_db
+from app.repositories.document_repository import DocumentRepository
 from app.schemas.admin import HealthResponse
 from app.schemas.document import DocumentReindexRequest, DocumentReindexResponse
 from app.services import SystemService
@@ -24,8 +27,11 @@ async def health_check(
     system_service: SystemService = Depends(get_system_service),
 ):
     """Health check endpoint"""
-    db_status = system_service.check_database_health(db)
-    openai_status = system_service.check_openai_health()
+    # Independent checks run concurrently in worker threads
+    db_status, openai_status = await asyncio.gather(
+        asyncio.to_thread(system_service.check_database_health, db),
+        asyncio.to_thread(system_service.check_openai_health),
+    )
     overall_status = system_service.get_overall_health(db_status, openai_status)
 
     return HealthResponse(
@@ -40,6 +46,7 @@ async def health_check(
 async def reindex_documents_selective(
     request: DocumentReindexRequest,
     db: Session = Depends(get_db),
+    repo: DocumentRepository = Depends(get_document_repo),
     system_service: SystemService = Depends(get_system_service),
 ):
     """
@@ -47,10 +54,6 @@ async def reindex_documents_selective(
 
     - **filenames**: List of filenames to reindex. Empty means reindex all new/modified
     """
-    from app.repositories.document_repository import DocumentRepository
-
-    repo = DocumentRepository(db)
-
     # Determine which documents to reindex
     if request.filenames:
         # Reindex specific files
@@ -69,7 +72,7 @@ async def reindex_documents_selective(
         )
 
     # Reindex documents
-    result = system_service.trigger_selective_reindex(
+    result = await system_service.trigger_selective_reindex(
         db, [doc.filename for doc in documents_to_reindex]
     )
 
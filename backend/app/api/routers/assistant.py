@@ -37,7 +37,7 @@ async def chat(
         )
 
         # Get conversation history
-        conversation_history = assistant_service.get_conversation_history(
+        conversation_history = await assistant_service.get_conversation_history(
             conversation_id
         )
 
@@ -49,7 +49,7 @@ async def chat(
 
         # Retrieve relevant chunks (RAG Layer)
         # Note: Only use user query for retrieval, NOT conversation history
-        retrieved_chunks = assistant_service.retrieve_relevant_chunks(
+        retrieved_chunks = await assistant_service.retrieve_relevant_chunks(
             message.message, db
         )
 
@@ -71,7 +71,7 @@ async def chat(
         )
 
         # Update conversation history
-        assistant_service.update_conversation_history(
+        await assistant_service.update_conversation_history(
             conversation_id, message.message, answer
         )
 
@@ -106,7 +106,7 @@ async def clear_conversation(
     """
     Clear conversation history
     """
-    if assistant_service.clear_conversation(conversation_id):
+    if await assistant_service.clear_conversation(conversation_id):
         return {"status": "success", "message": "對話已清除"}
     else:
         raise HTTPException(status_code=404, detail="找不到該對話")
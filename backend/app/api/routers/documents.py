@@ -1,66 +1,87 @@
+import asyncio
 import os
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from pathlib import Path
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    status,
+)
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
+from app.api.deps import get_document_repo
 from app.core.config import settings
 from app.db.session import get_db
-from app.models.document import DocumentStatus
+from app.models.document import Document, DocumentStatus
 from app.models.document_chunk import DocumentChunk
 from app.repositories.document_repository import DocumentRepository
+from app.repositories.vector_repository import bump_chunks_version
 from app.schemas.document import (
-    DocumentDetail,
     DocumentListItem,
     DocumentListResponse,
     DocumentStatusEnum,
-    DocumentSyncResponse,
+    DocumentSyncJobResponse,
 )
+from app.services import DocumentSyncService
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+# Max rows per bulk DELETE statement in cleanup
+CLEANUP_BATCH_SIZE = 1000
+
 
 @router.get("", response_model=DocumentListResponse)
 async def list_documents(
-    status_filter: DocumentStatusEnum | None = None, db: Session = Depends(get_db)
+    status_filter: DocumentStatusEnum | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    after: str | None = None,
+    repo: DocumentRepository = Depends(get_document_repo),
 ):
     """
     Get list of all documents with their status
 
     - **status_filter**: Optional filter by document status
+    - **limit**: Page size (default 100)
+    - **after**: Cursor from a previous page's `next_cursor`
     """
-    repo = DocumentRepository(db)
+    # Statistics are aggregated in SQL, independent of the filter
+    stats = repo.get_status_counts()
 
-    # Always get all documents for statistics
-    all_documents = repo.get_all_documents()
+    # Apply filter if specified
+    doc_status = DocumentStatus[status_filter.value.upper()] if status_filter else None
 
-    # Calculate statistics from all documents
-    stats = {"indexed": 0, "modified": 0, "new": 0, "deleted": 0}
-    for doc in all_documents:
-        stats[doc.status.value] += 1
+    # Rows are streamed from the cursor and converted as they arrive, so
+    # ORM objects are never all held at once
+    documents = [
+        DocumentListItem.model_validate(document)
+        for document in repo.iter_documents(status=doc_status, after=after, limit=limit)
+    ]
 
-    # Apply filter if specified
-    if status_filter:
-        documents = repo.get_documents_by_status(
-            DocumentStatus[status_filter.value.upper()]
-        )
-    else:
-        documents = all_documents
+    next_cursor = None
+    if len(documents) == limit:
+        next_cursor = documents[-1].filename
 
     return DocumentListResponse(
-        documents=[DocumentListItem.model_validate(doc) for doc in documents],
-        total=len(documents),
+        documents=documents,
+        total=stats[doc_status.value] if doc_status else sum(stats.values()),
         stats=stats,
+        next_cursor=next_cursor,
     )
 
 
-@router.get("/{filename}", response_model=DocumentDetail)
-async def get_document(filename: str, db: Session = Depends(get_db)):
+@router.get("/{filename}", response_model=DocumentListItem)
+async def get_document(
+    filename: str, repo: DocumentRepository = Depends(get_document_repo)
+):
     """
-    Get document details including content
+    Get document details (metadata only; see `/{filename}/content`)
 
     - **filename**: Document filename
     """
-    repo = DocumentRepository(db)
     document = repo.get_document_by_filename(filename)
 
     if not document:
@@ -69,43 +90,63 @@ async def get_document(filename: str, db: Session = Depends(get_db)):
             detail=f"Document '{filename}' not found",
         )
 
-    # Read document content from file
-    documents_dir = settings.documents_dir
-    file_path = os.path.join(documents_dir, filename)
+    return DocumentListItem.model_validate(document)
+
+
+@router.get("/{filename}/content", response_class=FileResponse)
+async def get_document_content(
+    filename: str, repo: DocumentRepository = Depends(get_document_repo)
+):
+    """
+    Get raw document content
+
+    The file is streamed from disk rather than loaded into memory and
+    wrapped in JSON.
+
+    - **filename**: Document filename
+    """
+    document = repo.get_document_by_filename(filename)
 
-    if not os.path.exists(file_path):
+    if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Document file '{filename}' not found on disk",
+            detail=f"Document '{filename}' not found",
         )
 
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-    except Exception as e:
+    file_path = Path(settings.documents_dir, document.filename)
+
+    if not await asyncio.to_thread(file_path.is_file):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error reading document: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document file '{filename}' not found on disk",
         )
 
-    # Convert to DocumentDetail
-    doc_dict = DocumentListItem.model_validate(document).model_dump()
-    doc_dict["content"] = content
+    return FileResponse(file_path, media_type="text/markdown; charset=utf-8")
+
 
-    return DocumentDetail(**doc_dict)
+def get_document_sync_service() -> DocumentSyncService:
+    """Dependency for DocumentSyncService"""
+    return DocumentSyncService()
 
 
-@router.post("/sync", response_model=DocumentSyncResponse)
-async def sync_documents(db: Session = Depends(get_db)):
+@router.post(
+    "/sync",
+    response_model=DocumentSyncJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def sync_documents(
+    background_tasks: BackgroundTasks,
+    sync_service: DocumentSyncService = Depends(get_document_sync_service),
+):
     """
-    Sync document records with files in documents directory
+    Start syncing document records with files in documents directory
 
-    This will:
+    The sync runs in the background; poll `/documents/sync/{job_id}` for
+    its result. This will:
     - Add new documents found in the directory
     - Mark modified documents (based on file hash)
     - Mark missing documents as deleted
     """
-    repo = DocumentRepository(db)
     documents_dir = settings.documents_dir
 
     if not os.path.exists(documents_dir):
@@ -114,17 +155,39 @@ async def sync_documents(db: Session = Depends(get_db)):
             detail=f"Documents directory '{documents_dir}' not found",
         )
 
-    stats = repo.sync_documents_from_directory(documents_dir)
-    documents = repo.get_all_documents()
+    job, created = await sync_service.get_or_create_job()
+    if created:
+        background_tasks.add_task(sync_service.run_sync, job["job_id"], documents_dir)
 
-    return DocumentSyncResponse(
-        stats=stats,
-        documents=[DocumentListItem.model_validate(doc) for doc in documents],
-    )
+    return DocumentSyncJobResponse(**job)
+
+
+@router.get("/sync/{job_id}", response_model=DocumentSyncJobResponse)
+async def get_sync_job(
+    job_id: str,
+    sync_service: DocumentSyncService = Depends(get_document_sync_service),
+):
+    """
+    Get status of a document sync job
+
+    - **job_id**: Job ID returned by `POST /documents/sync`
+    """
+    job = await sync_service.get_job(job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sync job '{job_id}' not found",
+        )
+
+    return DocumentSyncJobResponse(**job)
 
 
 @router.delete("/cleanup")
-async def cleanup_deleted_documents(db: Session = Depends(get_db)):
+async def cleanup_deleted_documents(
+    db: Session = Depends(get_db),
+    repo: DocumentRepository = Depends(get_document_repo),
+):
     """
     Clean up documents marked as deleted
 
@@ -132,24 +195,26 @@ async def cleanup_deleted_documents(db: Session = Depends(get_db)):
     - Delete all document chunks for deleted documents
     - Remove document records marked as deleted
     """
-    repo = DocumentRepository(db)
     deleted_docs = repo.get_documents_by_status(DocumentStatus.DELETED)
 
     if not deleted_docs:
         return {"message": "沒有需要清理的文件", "deleted_count": 0}
 
-    deleted_count = 0
-    for doc in deleted_docs:
-        # Delete chunks for this document
-        db.query(DocumentChunk).filter(
-            DocumentChunk.source_file == doc.filename
-        ).delete()
+    filenames = [doc.filename for doc in deleted_docs]
+    ids = [doc.id for doc in deleted_docs]
 
-        # Delete document record
-        repo.delete_document(doc)
-        deleted_count += 1
+    # Bulk delete in batches to keep the IN (...) parameter count bounded
+    for i in range(0, len(ids), CLEANUP_BATCH_SIZE):
+        db.query(DocumentChunk).filter(
+            DocumentChunk.source_file.in_(filenames[i : i + CLEANUP_BATCH_SIZE])
+        ).delete(synchronize_session=False)
+        db.query(Document).filter(
+            Document.id.in_(ids[i : i + CLEANUP_BATCH_SIZE])
+        ).delete(synchronize_session=False)
 
     db.commit()
+    await bump_chunks_version()
+    deleted_count = len(ids)
 
     return {
         "message": f"已清理 {deleted_count} 個已刪除的文件",
@@ -1,4 +1,10 @@
-from .embedding_client import EmbeddingClient
+from .embedding_client import EmbeddingClient, get_embedding_client
 from .llm_client import LLMClient
+from .redis_client import get_redis_client
 
-__all__ = ["LLMClient", "EmbeddingClient"]
+__all__ = [
+    "LLMClient",
+    "EmbeddingClient",
+    "get_embedding_client",
+    "get_redis_client",
+]
@@ -1,24 +1,109 @@
+import asyncio
+import base64
+import hashlib
 import logging
 import math
+import threading
 import time
-from typing import List
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional
 
-from openai import OpenAI, OpenAIError
+import numpy as np
+from openai import AsyncOpenAI, OpenAI, OpenAIError
 
 from app.core import settings
 
 logger = logging.getLogger(__name__)
 
+# In-process dtype for embedding vectors: half the memory of float32
+EMBEDDING_DTYPE = np.float16
+
+
+class EmbeddingCache:
+    """Process-local LRU cache of embeddings keyed by (model, content hash)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        """Build a compact cache key from model name and text content"""
+        return hashlib.blake2b(
+            f"{model}\0{text}".encode("utf-8"), digest_size=16
+        ).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Return cached embedding and mark it as recently used"""
+        with self._lock:
+            embedding = self._data.get(key)
+            if embedding is not None:
+                self._data.move_to_end(key)
+            return embedding
+
+    def put(self, key: bytes, embedding: np.ndarray) -> None:
+        """Store embedding, evicting the least recently used entries"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = embedding
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# Shared across EmbeddingClient instances
+_embedding_cache = EmbeddingCache(settings.embedding_cache_size)
+
 
 class EmbeddingClient:
     """Client for generating embeddings using OpenAI-compatible API"""
 
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        # Rate limits (429), timeouts and 5xx are retried by the OpenAI client
+        # with exponential backoff and jitter, honoring Retry-After
+        self.client = OpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=settings.embedding_max_retries,
+        )
+        self.async_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=settings.embedding_max_retries,
+        )
         self.model = settings.openai_embedding_model
         self.batch_size = settings.embedding_batch_size
+        self.concurrency = settings.embedding_concurrency
+        self.cache = _embedding_cache
 
-    def generate_embedding(self, text: str) -> List[float]:
+    @staticmethod
+    def _to_array(embedding: str | List[float]) -> np.ndarray:
+        """
+        Convert an API embedding into a read-only, L2-normalized
+        EMBEDDING_DTYPE array
+
+        Base64 payloads (packed little-endian float32) are decoded directly,
+        without materializing a Python float list; servers that ignore
+        `encoding_format` and return plain lists are handled as well.
+        Vectors are normalized here, once, so stored chunk embeddings can be
+        compared with plain dot products at query time.
+        """
+        if isinstance(embedding, str):
+            vector = np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+        else:
+            vector = np.asarray(embedding, dtype=np.float32)
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        vector = vector.astype(EMBEDDING_DTYPE)
+        # Arrays are shared through the cache, so guard against mutation
+        vector.flags.writeable = False
+        return vector
+
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
 
@@ -26,18 +111,56 @@ class EmbeddingClient:
             text: Text to embed
 
         Returns:
-            Embedding vector as list of floats
+            Embedding vector as an EMBEDDING_DTYPE array
         """
+        key = self.cache.make_key(self.model, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
             response = self.client.embeddings.create(
                 model=self.model,
                 input=text,
+                encoding_format="base64",
             )
-            return response.data[0].embedding
         except OpenAIError as e:
             logger.exception("Embedding API error")
             raise
 
+        embedding = self._to_array(response.data[0].embedding)
+        self.cache.put(key, embedding)
+        return embedding
+
+    async def agenerate_embedding(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a single text without blocking the event loop
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector as an EMBEDDING_DTYPE array
+        """
+        key = self.cache.make_key(self.model, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await self.async_client.embeddings.create(
+                model=self.model,
+                input=text,
+                encoding_format="base64",
+            )
+        except OpenAIError:
+            logger.exception("Embedding API error")
+            raise
+
+        embedding = self._to_array(response.data[0].embedding)
+        self.cache.put(key, embedding)
+        return embedding
+
     def _clean_texts(self, texts: List[str]) -> List[str]:
         """
         Clean and validate input texts
@@ -50,57 +173,130 @@ class EmbeddingClient:
         """
         return [t.strip() if isinstance(t, str) and t.strip() else " " for t in texts]
 
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    async def _embed_batch(
+        self,
+        batch: List[str],
+        batch_num: int,
+        total_batches: int,
+        semaphore: asyncio.Semaphore,
+    ) -> List[np.ndarray]:
         """
-        Generate embeddings for a batch of texts
+        Embed a single batch, bounded by the shared concurrency semaphore
+
+        Rate limit (429) responses are retried with exponential backoff
+        by the OpenAI client itself (up to `embedding_max_retries` times).
 
         Args:
-            texts: List of texts to embed
+            batch: Cleaned texts for this batch
+            batch_num: 1-based batch number (for logging)
+            total_batches: Total number of batches (for logging)
+            semaphore: Semaphore capping in-flight requests
 
         Returns:
-            List of embedding vectors
+            Embedding vectors for the batch, in input order
         """
-        if not texts:
-            return []
-
-        cleaned_texts = self._clean_texts(texts)
-        embeddings = []
-        total_batches = math.ceil(len(cleaned_texts) / self.batch_size)
-
-        for i in range(0, len(cleaned_texts), self.batch_size):
-            batch = cleaned_texts[i : i + self.batch_size]
-            batch_num = (i // self.batch_size) + 1
-
+        async with semaphore:
             start_time = time.time()
 
             try:
-                response = self.client.embeddings.create(
+                response = await self.async_client.embeddings.create(
                     model=self.model,
                     input=batch,
+                    encoding_format="base64",
                 )
-
-                batch_embeddings = [d.embedding for d in response.data]
-                embeddings.extend(batch_embeddings)
-
-                duration = time.time() - start_time
-                logger.info(
-                    "Batch %d/%d done (%d texts, %.2fs)",
+            except OpenAIError:
+                logger.exception(
+                    "Error generating embeddings for batch %d/%d",
                     batch_num,
                     total_batches,
-                    len(batch),
-                    duration,
                 )
+                raise
 
-                # Small delay to avoid rate limits
-                if i + self.batch_size < len(cleaned_texts):
-                    time.sleep(0.2)
+        duration = time.time() - start_time
+        logger.info(
+            "Batch %d/%d done (%d texts, %.2fs)",
+            batch_num,
+            total_batches,
+            len(batch),
+            duration,
+        )
 
-            except OpenAIError as e:
-                logger.exception(
-                    "Error generating embeddings for batch %d/%d",
-                    batch_num,
+        return [self._to_array(d.embedding) for d in response.data]
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Generate embeddings for a batch of texts
+
+        Batches are sent concurrently, with at most `embedding_concurrency`
+        requests in flight at once.
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            List of embedding vectors as EMBEDDING_DTYPE arrays
+        """
+        if not texts:
+            return []
+
+        cleaned_texts = self._clean_texts(texts)
+        keys = [self.cache.make_key(self.model, t) for t in cleaned_texts]
+        embeddings: List[Optional[np.ndarray]] = [self.cache.get(k) for k in keys]
+
+        # Only texts without a cached embedding are sent to the API, and
+        # identical texts (shared boilerplate, repeated headers) only once
+        miss_positions: Dict[bytes, List[int]] = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                miss_positions.setdefault(keys[i], []).append(i)
+
+        hit_count = len(cleaned_texts) - sum(map(len, miss_positions.values()))
+        if hit_count or len(miss_positions) < len(cleaned_texts) - hit_count:
+            logger.info(
+                "Embedding %d unique texts (%d total, %d cache hits)",
+                len(miss_positions),
+                len(cleaned_texts),
+                hit_count,
+            )
+        if not miss_positions:
+            return embeddings
+
+        # Sort by length so each request carries similarly sized inputs
+        miss_keys = sorted(
+            miss_positions, key=lambda k: len(cleaned_texts[miss_positions[k][0]])
+        )
+        miss_texts = [cleaned_texts[miss_positions[k][0]] for k in miss_keys]
+        total_batches = math.ceil(len(miss_texts) / self.batch_size)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        # gather() preserves task order, so results line up with miss_keys
+        batch_results = await asyncio.gather(
+            *(
+                self._embed_batch(
+                    miss_texts[i : i + self.batch_size],
+                    (i // self.batch_size) + 1,
                     total_batches,
+                    semaphore,
                 )
-                raise
+                for i in range(0, len(miss_texts), self.batch_size)
+            )
+        )
+
+        miss_embeddings = [e for batch in batch_results for e in batch]
+        for key, embedding in zip(miss_keys, miss_embeddings):
+            self.cache.put(key, embedding)
+            for i in miss_positions[key]:
+                embeddings[i] = embedding
 
         return embeddings
+
+
+@lru_cache
+def get_embedding_client() -> EmbeddingClient:
+    """
+    Get the shared embedding client
+
+    The underlying OpenAI clients hold HTTP connection pools, so a single
+    instance is reused for the whole process.
+    """
+    return EmbeddingClient()
@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+from redis.asyncio import Redis
+
+from app.core import settings
+
+
+@lru_cache
+def get_redis_client() -> Redis:
+    """
+    Get the shared async Redis client
+
+    The client holds a connection pool, so a single instance is reused
+    for the whole process.
+    """
+    return Redis.from_url(settings.redis_url, decode_responses=True)
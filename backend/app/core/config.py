@@ -25,6 +25,11 @@ class Settings(BaseSettings):
     db_password: str
     db_database: str
 
+    # Redis Configuration
+    redis_url: str = "redis://localhost:6379/0"
+    conversation_ttl_seconds: int = 86400
+    sync_job_ttl_seconds: int = 86400
+
     # Documents Configuration
     documents_dir: str = "/workspace/documents"
 
@@ -40,9 +45,15 @@ class Settings(BaseSettings):
     # Retrieval Configuration
     top_k_results: int = 7
     similarity_threshold: float = 0.4
+    hnsw_ef_search: int = 0  # 0 = derive from the number of results fetched
+    retrieval_cache_size: int = 10000
+    retrieval_cache_ttl: int = 600  # seconds
     chunk_size: int = 320
     chunk_overlap: int = 64
     embedding_batch_size: int = 20
+    embedding_concurrency: int = 5
+    embedding_cache_size: int = 10000
+    embedding_max_retries: int = 5
 
     # MMR (Maximal Marginal Relevance) Configuration
     use_mmr: bool = True
@@ -1,8 +1,25 @@
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core import settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+def _json_serializer(obj) -> str:
+    """Serialize JSON/JSONB values with orjson"""
+    return orjson.dumps(obj).decode()
+
+
+engine = create_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    # executemany INSERTs are sent as multi-row VALUES, up to 1000 rows per
+    # statement; executemany UPDATE/DELETE (e.g. bulk status updates during
+    # sync) go through psycopg2's execute_batch instead of one per row
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=1000,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
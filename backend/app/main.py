@@ -1,4 +1,5 @@
 import logging
+import ssl
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -7,6 +8,7 @@ from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api import admin_router, assistant_router, documents_router
+from app.clients import get_redis_client
 from app.core import DomainError, settings
 
 # Configure logging
@@ -23,11 +25,15 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Canvas RAG Assistant API...")
     logger.info("✓ Application started (database migrations managed by Alembic)")
+    # hashlib's SHA-256 (document change detection) is provided by this build;
+    # OpenSSL 1.1.1+ picks SHA-NI / SSSE3 code paths at runtime via cpuid
+    logger.info(f"Using {ssl.OPENSSL_VERSION} for file hashing")
 
     yield
 
     # Shutdown
     logger.info("Shutting down Canvas RAG Assistant API...")
+    await get_redis_client().aclose()
 
 
 # Create FastAPI app
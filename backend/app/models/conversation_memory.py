@@ -22,7 +22,11 @@ class ConversationMemory(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(
-        String(255), nullable=False, index=True, comment="會話 session ID"
+        String(255),
+        nullable=False,
+        unique=True,
+        index=True,
+        comment="會話 session ID",
     )
 
     # Layer 2: Summarized Memory
@@ -1,10 +1,13 @@
 import enum
-from datetime import datetime
 
-from sqlalchemy import TIMESTAMP, Column, Enum, Integer, String
+from sqlalchemy import TIMESTAMP, BigInteger, Column, Enum, Index, Integer, String
+from sqlalchemy.sql import func, text
 
 from app.db import Base
 
+# Algorithm used for file_hash on newly hashed documents
+FILE_HASH_ALGORITHM = "blake3"
+
 
 class DocumentStatus(str, enum.Enum):
     """Document status enum"""
@@ -19,17 +22,36 @@ class Document(Base):
     """Document model for tracking document metadata and status"""
 
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_status_filename", "status", "filename"),
+        # Small partial index for the reindex queue (new/modified only)
+        Index(
+            "ix_documents_needing_reindex",
+            "filename",
+            postgresql_where=text("status IN ('new', 'modified')"),
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     filename = Column(String(255), nullable=False, unique=True, index=True)
-    file_hash = Column(String(64), nullable=False)  # SHA256 hash
+    file_hash = Column(String(64), nullable=False)  # 32-byte hex digest
+    hash_algorithm = Column(String(16), nullable=False, default=FILE_HASH_ALGORITHM)
+    # File stat at last hash, used to skip rehashing unchanged files
+    file_mtime_ns = Column(BigInteger, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
     status = Column(
         Enum(DocumentStatus, values_callable=lambda x: [e.value for e in x]),
         nullable=False,
         default=DocumentStatus.NEW,
     )
     indexed_at = Column(TIMESTAMP, nullable=True)
-    created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    # Timestamps are naive UTC, computed by the database
+    created_at = Column(
+        TIMESTAMP, server_default=func.timezone("utc", func.now()), nullable=False
+    )
     updated_at = Column(
-        TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        TIMESTAMP,
+        server_default=func.timezone("utc", func.now()),
+        onupdate=func.timezone("utc", func.now()),
+        nullable=False,
     )
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from sqlalchemy import Column, Index, Integer, String, Text, TIMESTAMP
 from sqlalchemy.dialects.postgresql import JSONB
-from pgvector.sqlalchemy import Vector
-from datetime import datetime
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import HALFVEC
 from app.db import Base
 
 
@@ -11,9 +11,19 @@ class DocumentChunk(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(1536), nullable=False)
+    embedding = Column(HALFVEC(1536), nullable=False)  # FP16 storage
     source_file = Column(String(255), nullable=False, index=True)
     heading_path = Column(Text)
     chunk_index = Column(Integer)
     chunk_metadata = Column(JSONB)
-    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    created_at = Column(TIMESTAMP, server_default=func.timezone("utc", func.now()))
+
+    __table_args__ = (
+        # ANN index served by the cosine distance operator (<=>)
+        Index(
+            "document_chunks_embedding_idx",
+            embedding,
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        ),
+    )
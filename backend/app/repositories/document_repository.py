@@ -1,12 +1,54 @@
 import hashlib
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import text
+import blake3
+from sqlalchemy import Row, bindparam, func, insert, select, text, update
 from sqlalchemy.orm import Session
 
-from app.models.document import Document, DocumentStatus
+from app.models.document import FILE_HASH_ALGORITHM, Document, DocumentStatus
+
+# Read size used when hashing files that cannot be memory-mapped
+HASH_READ_BLOCK_SIZE = 1 << 20
+
+# Zeroed template for status statistics, computed once
+_STATUS_VALUES = tuple(status.value for status in DocumentStatus)
+
+# Statements are built once at import time so every call reuses the same
+# construct and hits SQLAlchemy's compiled-statement cache; per-call values
+# are passed as bound parameters.
+_SELECT_ALL_DOCUMENTS = select(Document).order_by(Document.filename)
+_SELECT_DOCUMENT_BY_FILENAME = select(Document).where(
+    Document.filename == bindparam("filename")
+)
+_SELECT_DOCUMENTS_BY_FILENAMES = select(Document).where(
+    Document.filename.in_(bindparam("filenames", expanding=True))
+)
+_SELECT_DOCUMENTS_BY_STATUS = (
+    select(Document)
+    .where(Document.status == bindparam("status"))
+    .order_by(Document.filename)
+)
+_SELECT_DOCUMENTS_NEEDING_REINDEX = select(Document).where(
+    Document.status.in_([DocumentStatus.NEW, DocumentStatus.MODIFIED])
+)
+# Only the columns sync compares, as plain rows rather than ORM objects
+_SELECT_SYNC_STATE = select(
+    Document.id,
+    Document.filename,
+    Document.file_hash,
+    Document.hash_algorithm,
+    Document.file_mtime_ns,
+    Document.file_size,
+    Document.status,
+    Document.updated_at,
+)
+_SELECT_STATUS_COUNTS = select(Document.status, func.count(Document.id)).group_by(
+    Document.status
+)
 
 
 class DocumentRepository:
@@ -16,21 +58,98 @@ class DocumentRepository:
         self.db = db
 
     @staticmethod
-    def calculate_file_hash(file_path: str) -> str:
-        """Calculate SHA256 hash of a file"""
-        sha256_hash = hashlib.sha256()
+    def _hash_file_stream(hasher, file_path: str) -> str:
+        """
+        Hash a file by reading it into a reused buffer
+
+        Fallback for files that cannot be memory-mapped (e.g. on some
+        network filesystems); large blocks keep the Python loop short.
+        """
+        buffer = bytearray(HASH_READ_BLOCK_SIZE)
+        view = memoryview(buffer)
+        with open(file_path, "rb", buffering=0) as f:
+            while size := f.readinto(buffer):
+                hasher.update(view[:size])
+        return hasher.hexdigest()
+
+    @classmethod
+    def calculate_file_hash(cls, file_path: str) -> str:
+        """Calculate BLAKE3 hash of a file (memory-mapped, GIL released)"""
+        try:
+            return blake3.blake3().update_mmap(file_path).hexdigest()
+        except OSError:
+            return cls._hash_file_stream(blake3.blake3(), file_path)
+
+    @classmethod
+    def calculate_legacy_file_hash(cls, file_path: str) -> str:
+        """Calculate SHA256 hash of a file, as stored before BLAKE3"""
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            # mmap cannot map empty files
+            if os.fstat(f.fileno()).st_size == 0:
+                return hashlib.sha256(b"").hexdigest()
+
+            # Hash the mapped file in a single C call, no read() buffer copies
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return hashlib.sha256(mm).hexdigest()
+            except OSError:
+                pass
+
+        return cls._hash_file_stream(hashlib.sha256(), file_path)
+
+    @staticmethod
+    def iter_markdown_files(documents_dir: str) -> Iterator[os.DirEntry]:
+        """
+        Yield markdown file entries in a directory
+
+        os.scandir returns entries with the file type cached from the
+        directory read, so filtering to regular files needs no extra stat.
+        """
+        with os.scandir(documents_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md") and entry.is_file():
+                    yield entry
+
+    @classmethod
+    def _hash_for_comparison(cls, job: Tuple[str, bool]) -> Tuple[str, str]:
+        """
+        Hash a file for change detection
+
+        Args:
+            job: File path and whether its stored hash is a legacy SHA256 one
+
+        Returns:
+            Current BLAKE3 hash, and the hash to compare against the stored one
+        """
+        file_path, legacy = job
+        current_hash = cls.calculate_file_hash(file_path)
+        if legacy:
+            return current_hash, cls.calculate_legacy_file_hash(file_path)
+        return current_hash, current_hash
+
+    def _get_sync_state(self) -> Dict[str, Row]:
+        """Get the columns needed by sync for every document, keyed by filename"""
+        return {row.filename: row for row in self.db.execute(_SELECT_SYNC_STATE)}
 
     def get_all_documents(self) -> List[Document]:
         """Get all documents"""
-        return self.db.query(Document).order_by(Document.filename).all()
+        return self.db.execute(_SELECT_ALL_DOCUMENTS).scalars().all()
 
     def get_document_by_filename(self, filename: str) -> Optional[Document]:
         """Get document by filename"""
-        return self.db.query(Document).filter(Document.filename == filename).first()
+        return self.db.execute(
+            _SELECT_DOCUMENT_BY_FILENAME, {"filename": filename}
+        ).scalar_one_or_none()
+
+    def get_documents_by_filenames(self, filenames: List[str]) -> List[Document]:
+        """Get the documents matching any of the filenames, in one query"""
+        if not filenames:
+            return []
+        return (
+            self.db.execute(_SELECT_DOCUMENTS_BY_FILENAMES, {"filenames": filenames})
+            .scalars()
+            .all()
+        )
 
     def create_document(
         self, filename: str, file_hash: str, status: DocumentStatus = DocumentStatus.NEW
@@ -52,12 +171,13 @@ class DocumentRepository:
         """Update document metadata"""
         if file_hash is not None:
             document.file_hash = file_hash
+            document.hash_algorithm = FILE_HASH_ALGORITHM
         if status is not None:
             document.status = status
         if indexed_at is not None:
             document.indexed_at = indexed_at
 
-        document.updated_at = datetime.utcnow()
+        # updated_at is set by the database on UPDATE
         self.db.commit()
         self.db.refresh(document)
         return document
@@ -68,6 +188,18 @@ class DocumentRepository:
             document, status=DocumentStatus.INDEXED, indexed_at=datetime.utcnow()
         )
 
+    def mark_many_as_indexed(self, documents: List[Document]) -> None:
+        """Mark documents as indexed with a single UPDATE"""
+        if not documents:
+            return
+        self.db.execute(
+            update(Document)
+            .where(Document.id.in_([document.id for document in documents]))
+            .values(status=DocumentStatus.INDEXED, indexed_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+
     def delete_document(self, document: Document) -> None:
         """Delete document record"""
         self.db.delete(document)
@@ -81,55 +213,174 @@ class DocumentRepository:
         stats = {"new": 0, "modified": 0, "deleted": 0, "unchanged": 0}
 
         # Get all markdown files in directory
-        if not os.path.exists(documents_dir):
+        if not os.path.isdir(documents_dir):
             return stats
 
-        files_in_dir = set()
-        for filename in os.listdir(documents_dir):
-            if filename.endswith(".md"):
-                files_in_dir.add(filename)
+        files_in_dir = {
+            entry.name: entry for entry in self.iter_markdown_files(documents_dir)
+        }
 
         # Check existing documents
-        existing_docs = {doc.filename: doc for doc in self.get_all_documents()}
+        existing_docs = self._get_sync_state()
+
+        new_rows = []
+        modified_rows = []
+        restat_rows = []
 
         # Process files in directory
-        for filename in files_in_dir:
-            file_path = os.path.join(documents_dir, filename)
-            current_hash = self.calculate_file_hash(file_path)
+        to_hash = []
+        for filename, entry in files_in_dir.items():
+            file_stat = entry.stat()
+            doc = existing_docs.get(filename)
+
+            # Same mtime and size as when last hashed: skip rehashing, unless
+            # the stored hash still needs upgrading to the current algorithm
+            if (
+                doc is not None
+                and doc.hash_algorithm == FILE_HASH_ALGORITHM
+                and doc.file_mtime_ns == file_stat.st_mtime_ns
+                and doc.file_size == file_stat.st_size
+            ):
+                stats["unchanged"] += 1
+                continue
+
+            # Hashes stored before the BLAKE3 switch are compared as SHA256
+            legacy = doc is not None and doc.hash_algorithm != FILE_HASH_ALGORITHM
+            to_hash.append((filename, entry.path, file_stat, doc, legacy))
 
-            if filename in existing_docs:
-                doc = existing_docs[filename]
-                if doc.file_hash != current_hash:
+        # Hash the remaining files in parallel (blake3 releases the GIL).
+        # Markdown files are small, so spreading files across threads beats
+        # BLAKE3's own multithreading within a single file.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            hashes = list(
+                executor.map(
+                    self._hash_for_comparison,
+                    [(path, legacy) for _, path, _, _, legacy in to_hash],
+                )
+            )
+
+        for (filename, _, file_stat, doc, _), (current_hash, comparable_hash) in zip(
+            to_hash, hashes
+        ):
+            if doc is not None:
+                if doc.file_hash != comparable_hash:
                     # File has been modified
-                    self.update_document(
-                        doc, file_hash=current_hash, status=DocumentStatus.MODIFIED
+                    modified_rows.append(
+                        {
+                            "id": doc.id,
+                            "file_hash": current_hash,
+                            "hash_algorithm": FILE_HASH_ALGORITHM,
+                            "file_mtime_ns": file_stat.st_mtime_ns,
+                            "file_size": file_stat.st_size,
+                            "status": DocumentStatus.MODIFIED,
+                        }
                     )
-                    stats["modified"] += 1
                 else:
+                    # Content unchanged (e.g. touched); record new stat and
+                    # upgrade legacy hashes in place
+                    restat_rows.append(
+                        {
+                            "id": doc.id,
+                            "file_hash": current_hash,
+                            "hash_algorithm": FILE_HASH_ALGORITHM,
+                            "file_mtime_ns": file_stat.st_mtime_ns,
+                            "file_size": file_stat.st_size,
+                            "updated_at": doc.updated_at,
+                        }
+                    )
                     stats["unchanged"] += 1
             else:
                 # New file
-                self.create_document(
-                    filename=filename, file_hash=current_hash, status=DocumentStatus.NEW
+                new_rows.append(
+                    {
+                        "filename": filename,
+                        "file_hash": current_hash,
+                        "hash_algorithm": FILE_HASH_ALGORITHM,
+                        "file_mtime_ns": file_stat.st_mtime_ns,
+                        "file_size": file_stat.st_size,
+                        "status": DocumentStatus.NEW,
+                    }
                 )
-                stats["new"] += 1
 
         # Mark documents not in directory as deleted
-        for filename, doc in existing_docs.items():
-            if filename not in files_in_dir and doc.status != DocumentStatus.DELETED:
-                self.update_document(doc, status=DocumentStatus.DELETED)
-                stats["deleted"] += 1
+        deleted_ids = [
+            doc.id
+            for filename, doc in existing_docs.items()
+            if filename not in files_in_dir and doc.status != DocumentStatus.DELETED
+        ]
+
+        # Apply all changes as bulk statements in a single transaction
+        try:
+            # A resync can simply be re-run, so skip waiting for the WAL flush
+            self.db.execute(text("SET LOCAL synchronous_commit = OFF"))
+            if new_rows:
+                self.db.execute(insert(Document), new_rows)
+            if modified_rows:
+                self.db.execute(update(Document), modified_rows)
+            if restat_rows:
+                self.db.execute(update(Document), restat_rows)
+            if deleted_ids:
+                self.db.execute(
+                    update(Document)
+                    .where(Document.id.in_(deleted_ids))
+                    .values(status=DocumentStatus.DELETED),
+                    execution_options={"synchronize_session": False},
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        stats["new"] = len(new_rows)
+        stats["modified"] = len(modified_rows)
+        stats["deleted"] = len(deleted_ids)
 
         return stats
 
     def get_documents_by_status(self, status: DocumentStatus) -> List[Document]:
         """Get documents by status"""
-        return self.db.query(Document).filter(Document.status == status).all()
-
-    def get_documents_needing_reindex(self) -> List[Document]:
-        """Get documents that need to be reindexed (new or modified)"""
         return (
-            self.db.query(Document)
-            .filter(Document.status.in_([DocumentStatus.NEW, DocumentStatus.MODIFIED]))
+            self.db.execute(_SELECT_DOCUMENTS_BY_STATUS, {"status": status})
+            .scalars()
             .all()
         )
+
+    def iter_documents(
+        self,
+        status: Optional[DocumentStatus] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 200,
+    ) -> Iterator[Document]:
+        """
+        Stream documents ordered by filename
+
+        Rows are fetched from the cursor `batch_size` at a time instead of
+        being materialized up front. Pagination is keyset-based: pass the
+        last filename of the previous page as `after`.
+        """
+        stmt = select(Document)
+        if status is not None:
+            stmt = stmt.where(Document.status == status)
+        if after is not None:
+            stmt = stmt.where(Document.filename > after)
+        stmt = stmt.order_by(Document.filename)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        yield from self.db.execute(
+            stmt.execution_options(yield_per=batch_size)
+        ).scalars()
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """Get number of documents per status, with every status present"""
+        counts = dict.fromkeys(_STATUS_VALUES, 0)
+        counts.update(
+            (status.value, count)
+            for status, count in self.db.execute(_SELECT_STATUS_COUNTS)
+        )
+        return counts
+
+    def get_documents_needing_reindex(self) -> List[Document]:
+        """Get documents that need to be reindexed (new or modified)"""
+        return self.db.execute(_SELECT_DOCUMENTS_NEEDING_REINDEX).scalars().all()
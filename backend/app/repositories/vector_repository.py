@@ -1,10 +1,71 @@
-from typing import Dict, List, Tuple
+import io
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+import numpy as np
+import orjson
+from sqlalchemy import Integer, column, func, insert, select, true, values
+from sqlalchemy.orm import Session, aliased, defer
 
+from app.clients import get_redis_client
 from app.core import settings
 from app.models import DocumentChunk
 
+# pgvector's default hnsw.ef_search; never search with a narrower list
+HNSW_DEFAULT_EF_SEARCH = 40
+
+# Below this many rows, COPY setup costs more than it saves
+COPY_MIN_ROWS = 100
+
+_COPY_CHUNKS_SQL = (
+    "COPY document_chunks "
+    "(content, embedding, source_file, heading_path, chunk_index, chunk_metadata) "
+    "FROM STDIN"
+)
+
+# Characters that must be backslash-escaped in COPY text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+# Bumped after chunk writes or removals are committed; included in retrieval
+# cache keys so results cached before a reindex are never served afterwards.
+# Kept in Redis so a bump in one worker invalidates every worker's cache.
+CHUNKS_VERSION_KEY = "chunks:version"
+
+
+async def get_chunks_version() -> int:
+    """Return the current document chunk version"""
+    version = await get_redis_client().get(CHUNKS_VERSION_KEY)
+    return int(version) if version else 0
+
+
+async def bump_chunks_version() -> None:
+    """
+    Invalidate cached retrieval results after chunks change
+
+    Call only once the change is committed; results computed before that
+    would otherwise be cached under the new version.
+    """
+    await get_redis_client().incr(CHUNKS_VERSION_KEY)
+
+
+def _copy_field(value: Optional[str]) -> str:
+    """Encode a value as a COPY text-format field (None becomes NULL)"""
+    if value is None:
+        return "\\N"
+    return value.translate(_COPY_ESCAPES)
+
+
+def _chunk_row(chunk: Dict) -> Dict:
+    """Build an INSERT parameter set from a chunk dictionary"""
+    return {
+        "content": chunk["content"],
+        "embedding": chunk["embedding"],
+        "source_file": chunk["source_file"],
+        "heading_path": chunk.get("heading_path"),
+        "chunk_index": chunk["chunk_index"],
+        "chunk_metadata": chunk.get("chunk_metadata"),
+    }
+
 
 class VectorRepository:
     """Repository for vector similarity search operations"""
@@ -15,12 +76,29 @@ class VectorRepository:
             similarity_threshold or settings.similarity_threshold
         )
 
+    def _set_ef_search(self, db: Session, limit: Optional[int] = None) -> None:
+        """
+        Widen the HNSW candidate list for the current transaction
+
+        Ensures the index scan still yields `limit` (default top_k) rows
+        after the similarity filter; the list is never narrower than
+        pgvector's default. SET cannot take bind parameters, hence
+        set_config().
+        """
+        ef_search = settings.hnsw_ef_search or max(
+            HNSW_DEFAULT_EF_SEARCH, (limit or self.top_k) * 4
+        )
+        db.execute(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+
     def search_similar_chunks(
-        self, query_embedding: List[float], db: Session
+        self, query_embedding: np.ndarray, db: Session
     ) -> List[Tuple[DocumentChunk, float]]:
         """
         Search for similar chunks using vector similarity
 
+        Chunk embeddings are not loaded; use search_candidates_with_embeddings
+        when they are needed.
+
         Args:
             query_embedding: Query embedding vector
             db: Database session
@@ -28,32 +106,125 @@ class VectorRepository:
         Returns:
             List of (chunk, similarity_score) tuples
         """
-        # Use SQLAlchemy ORM query instead of raw SQL for proper type conversion
-        from sqlalchemy import func
-        
-        # Calculate similarity and filter
-        similarity = 1 - DocumentChunk.embedding.cosine_distance(query_embedding)
-        
+        return self._search(query_embedding, db, self.top_k, with_embeddings=False)
+
+    def search_candidates_with_embeddings(
+        self, query_embedding: np.ndarray, db: Session, fetch_k: int
+    ) -> List[Tuple[DocumentChunk, float]]:
+        """
+        Search for similar chunks, loading their embeddings in the same query
+
+        Used for re-ranking (e.g. MMR) over a candidate set larger than top_k.
+
+        Args:
+            query_embedding: Query embedding vector
+            db: Database session
+            fetch_k: Number of candidates to fetch
+
+        Returns:
+            List of (chunk, similarity_score) tuples
+        """
+        return self._search(query_embedding, db, fetch_k, with_embeddings=True)
+
+    def _search(
+        self,
+        query_embedding: np.ndarray,
+        db: Session,
+        limit: int,
+        with_embeddings: bool,
+    ) -> List[Tuple[DocumentChunk, float]]:
+        """Nearest chunks above the similarity threshold, with similarity"""
+        self._set_ef_search(db, limit)
+
+        # Compute the distance once in a subquery; the outer query derives
+        # similarity and filters/orders on the same column. Postgres flattens
+        # the subquery, so the ORDER BY is the plain `embedding <=> :q` that
+        # the HNSW index serves.
+        distance = DocumentChunk.embedding.cosine_distance(query_embedding)
+        sub = db.query(DocumentChunk, distance.label("distance")).subquery()
+        chunk_alias = aliased(DocumentChunk, sub)
+
+        query = db.query(chunk_alias, (1 - sub.c.distance).label("similarity"))
+        if not with_embeddings:
+            # Skip shipping 1536-dim vectors nobody reads
+            query = query.options(defer(chunk_alias.embedding))
+
         results = (
-            db.query(DocumentChunk, similarity.label("similarity"))
-            .filter(similarity > self.similarity_threshold)
-            .order_by(DocumentChunk.embedding.cosine_distance(query_embedding))
-            .limit(self.top_k)
+            query.filter(sub.c.distance < 1 - self.similarity_threshold)
+            .order_by(sub.c.distance)
+            .limit(limit)
             .all()
         )
-        
+
         # Results are already in the format [(chunk, similarity), ...]
         return results
 
+    def search_similar_chunks_batch(
+        self, query_embeddings: List[np.ndarray], db: Session
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """
+        Search for similar chunks for several queries in one round-trip
+
+        The query vectors are sent as a VALUES list and each one probes the
+        index through a LATERAL subquery, so M queries cost one statement.
+
+        Args:
+            query_embeddings: Query embedding vectors
+            db: Database session
+
+        Returns:
+            One list of (chunk, similarity_score) tuples per query, in order
+        """
+        if not query_embeddings:
+            return []
+
+        self._set_ef_search(db)
+
+        queries = values(
+            column("qid", Integer),
+            column("q", DocumentChunk.embedding.type),
+            name="t_q",
+        ).data(list(enumerate(query_embeddings)))
+
+        distance = DocumentChunk.embedding.cosine_distance(queries.c.q)
+        nearest = (
+            select(DocumentChunk, distance.label("distance"))
+            .where(distance < 1 - self.similarity_threshold)
+            .order_by(distance)
+            .limit(self.top_k)
+            .lateral("nearest")
+        )
+        chunk_alias = aliased(DocumentChunk, nearest)
+
+        stmt = (
+            select(
+                queries.c.qid,
+                chunk_alias,
+                (1 - nearest.c.distance).label("similarity"),
+            )
+            .select_from(queries)
+            .join(nearest, true())
+            .order_by(queries.c.qid, nearest.c.distance)
+            .options(defer(chunk_alias.embedding))
+        )
+
+        results: List[List[Tuple[DocumentChunk, float]]] = [
+            [] for _ in query_embeddings
+        ]
+        for qid, chunk, similarity in db.execute(stmt):
+            results[qid].append((chunk, similarity))
+        return results
+
     def add_chunk(
         self,
         content: str,
-        embedding: List[float],
+        embedding: np.ndarray,
         source_file: str,
         heading_path: str,
         chunk_index: int,
         chunk_metadata: dict,
         db: Session,
+        refresh: bool = False,
     ) -> DocumentChunk:
         """
         Add a new document chunk to the database
@@ -66,9 +237,12 @@ class VectorRepository:
             chunk_index: Index of chunk in document
             chunk_metadata: Additional metadata
             db: Database session
+            refresh: Reload the row (e.g. to read the assigned id) after commit
 
         Returns:
             Created DocumentChunk
+
+        Callers invalidate cached retrievals with bump_chunks_version().
         """
         chunk = DocumentChunk(
             content=content,
@@ -80,27 +254,105 @@ class VectorRepository:
         )
         db.add(chunk)
         db.commit()
-        db.refresh(chunk)
+        if refresh:
+            db.refresh(chunk)
         return chunk
 
-    def bulk_add_chunks(self, chunks: List[Dict], db: Session):
+    def bulk_add_chunks(self, chunks: List[Dict], db: Session, batch_size: int = 500):
         """
         Bulk insert document chunks
 
+        Rows go through a Core INSERT executemany (multi-row VALUES via
+        insertmanyvalues) without building ORM objects, and are committed
+        every `batch_size` rows to bound memory and transaction length.
+
         Args:
             chunks: List of chunk dictionaries with all required fields
             db: Database session
+            batch_size: Number of rows per INSERT/commit
+
+        Callers invalidate cached retrievals with bump_chunks_version().
         """
-        chunk_objects = [
-            DocumentChunk(
-                content=chunk["content"],
-                embedding=chunk["embedding"],
-                source_file=chunk["source_file"],
-                heading_path=chunk.get("heading_path"),
-                chunk_index=chunk["chunk_index"],
-                chunk_metadata=chunk.get("chunk_metadata"),
-            )
-            for chunk in chunks
-        ]
-        db.bulk_save_objects(chunk_objects)
+        stmt = insert(DocumentChunk)
+        for i in range(0, len(chunks), batch_size):
+            db.execute(stmt, [_chunk_row(c) for c in chunks[i : i + batch_size]])
+            db.commit()
+
+    def bulk_copy_chunks(self, chunks: List[Dict], db: Session):
+        """
+        Bulk insert document chunks with PostgreSQL COPY
+
+        COPY streams all rows in one command instead of parsing an INSERT
+        per batch, which matters for the embedding-heavy reindex payload.
+        Small inputs fall back to `bulk_add_chunks`.
+
+        Args:
+            chunks: List of chunk dictionaries with all required fields
+            db: Database session
+
+        Callers invalidate cached retrievals with bump_chunks_version().
+        """
+        if len(chunks) < COPY_MIN_ROWS:
+            self.bulk_add_chunks(chunks, db)
+            return
+
+        self._copy_chunks(chunks, db)
         db.commit()
+
+    def add_chunks_no_return(
+        self, chunks: List[Dict], db: Session, batch_size: int = 500
+    ):
+        """
+        Insert document chunks without committing or reading rows back
+
+        For pipelines that commit once for their whole unit of work (such
+        as reindexing). Large inputs are sent with COPY, small ones with
+        batched executemany.
+
+        Args:
+            chunks: List of chunk dictionaries with all required fields
+            db: Database session
+            batch_size: Number of rows per INSERT when COPY is not used
+
+        Callers invalidate cached retrievals with bump_chunks_version()
+        after their commit.
+        """
+        if len(chunks) >= COPY_MIN_ROWS:
+            self._copy_chunks(chunks, db)
+        else:
+            stmt = insert(DocumentChunk)
+            for i in range(0, len(chunks), batch_size):
+                db.execute(stmt, [_chunk_row(c) for c in chunks[i : i + batch_size]])
+
+    def _copy_chunks(self, chunks: List[Dict], db: Session):
+        """Stream chunks into document_chunks with COPY, without committing"""
+        buffer = io.StringIO()
+        for chunk in chunks:
+            embedding = np.asarray(chunk["embedding"], dtype=np.float32)
+            metadata = chunk.get("chunk_metadata")
+            buffer.write(
+                "\t".join(
+                    (
+                        _copy_field(chunk["content"]),
+                        "[" + ",".join(map(str, embedding.tolist())) + "]",
+                        _copy_field(chunk["source_file"]),
+                        _copy_field(chunk.get("heading_path")),
+                        _copy_field(
+                            None
+                            if chunk["chunk_index"] is None
+                            else str(chunk["chunk_index"])
+                        ),
+                        _copy_field(
+                            None
+                            if metadata is None
+                            else orjson.dumps(metadata).decode()
+                        ),
+                    )
+                )
+            )
+            buffer.write("\n")
+        buffer.seek(0)
+
+        # Runs on the session's own DBAPI connection, inside its transaction
+        with db.connection().connection.cursor() as cursor:
+            cursor.copy_expert(_COPY_CHUNKS_SQL, buffer)
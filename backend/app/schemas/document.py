@@ -63,12 +63,6 @@ class DocumentListItem(DocumentBase):
         from_attributes = True
 
 
-class DocumentDetail(DocumentListItem):
-    """Document detail schema with content"""
-
-    content: str = Field(..., description="Document content")
-
-
 class DocumentListResponse(BaseModel):
     """Document list response"""
 
@@ -77,6 +71,9 @@ class DocumentListResponse(BaseModel):
     stats: dict = Field(
         default_factory=dict, description="Statistics about document statuses"
     )
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page; null when there are no more"
+    )
 
 
 class DocumentSyncRequest(BaseModel):
@@ -85,13 +82,17 @@ class DocumentSyncRequest(BaseModel):
     pass
 
 
-class DocumentSyncResponse(BaseModel):
-    """Response from document sync"""
+class DocumentSyncJobResponse(BaseModel):
+    """Status of a background document sync job"""
 
-    stats: dict = Field(
-        ..., description="Sync statistics (new, modified, deleted, unchanged)"
+    job_id: str
+    status: str = Field(
+        ..., description="Job status (pending, running, completed, failed)"
     )
-    documents: list[DocumentListItem]
+    stats: Optional[dict] = Field(
+        None, description="Sync statistics (new, modified, deleted, unchanged)"
+    )
+    error: Optional[str] = None
 
 
 class DocumentReindexRequest(BaseModel):
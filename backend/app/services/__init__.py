@@ -1,7 +1,9 @@
 from .assistant_service import AssistantService
+from .document_sync_service import DocumentSyncService
 from .system_service import SystemService
 
 __all__ = [
     "AssistantService",
+    "DocumentSyncService",
     "SystemService",
 ]
@@ -1,10 +1,17 @@
+import json
 import logging
-from typing import Dict, List, Tuple
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from sqlalchemy.orm import Session
 
-from app.clients import LLMClient
+from app.clients import LLMClient, get_redis_client
+from app.core import settings
+from app.repositories.vector_repository import get_chunks_version
 from app.schemas.chat import Source
 from app.services.memory_service import MemoryService
 from app.services.rag_service import (
@@ -15,9 +22,50 @@ from app.services.rag_service import (
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory conversation storage (for demo purposes)
-# In production, use Redis or a proper database
-conversations = {}
+_ASCII_RE = re.compile(r"[\x00-\x7f]")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# Conversation history is stored in Redis lists, shared across workers
+CONVERSATION_KEY_PREFIX = "conv:"
+
+
+class RetrievalCache:
+    """Process-local LRU cache of retrieval results with a per-entry TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[tuple, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[List[Dict]]:
+        """Return cached chunks if present and not expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, chunks = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return chunks
+
+    def put(self, key: tuple, chunks: List[Dict]) -> None:
+        """Store chunks, evicting the least recently used entries"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, chunks)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# Shared across AssistantService instances (a service is created per request)
+_retrieval_cache = RetrievalCache(
+    settings.retrieval_cache_size, settings.retrieval_cache_ttl
+)
 
 
 class AssistantService:
@@ -27,34 +75,58 @@ class AssistantService:
         self.retriever = VectorRetriever()
         self.memory_service = MemoryService(db)
         self.db = db
+        self.retrieval_cache = _retrieval_cache
+        self.redis = get_redis_client()
 
     def get_or_create_conversation_id(self, conversation_id: str | None = None) -> str:
         """Get existing or create new conversation ID"""
         return conversation_id or str(uuid4())
 
-    def get_conversation_history(self, conversation_id: str) -> List[Dict]:
+    async def get_conversation_history(self, conversation_id: str) -> List[Dict]:
         """Get conversation history for a conversation ID"""
-        return conversations.get(conversation_id, [])
+        messages = await self.redis.lrange(
+            f"{CONVERSATION_KEY_PREFIX}{conversation_id}", 0, -1
+        )
+        return [json.loads(m) for m in messages]
 
-    def update_conversation_history(
+    async def update_conversation_history(
         self, conversation_id: str, user_message: str, assistant_message: str
     ):
         """Update conversation history with new messages"""
-        history = conversations.get(conversation_id, [])
-        history.append({"role": "user", "content": user_message})
-        history.append({"role": "assistant", "content": assistant_message})
-        conversations[conversation_id] = history
+        key = f"{CONVERSATION_KEY_PREFIX}{conversation_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(
+                key,
+                json.dumps({"role": "user", "content": user_message}),
+                json.dumps({"role": "assistant", "content": assistant_message}),
+            )
+            # Idle conversations expire instead of accumulating forever
+            pipe.expire(key, settings.conversation_ttl_seconds)
+            await pipe.execute()
 
-    def clear_conversation(self, conversation_id: str) -> bool:
+    async def clear_conversation(self, conversation_id: str) -> bool:
         """Clear conversation history, returns True if found and deleted"""
-        if conversation_id in conversations:
-            del conversations[conversation_id]
-            return True
-        return False
+        deleted = await self.redis.delete(f"{CONVERSATION_KEY_PREFIX}{conversation_id}")
+        return deleted > 0
 
-    def retrieve_relevant_chunks(self, query: str, db: Session) -> List[Dict]:
+    async def retrieve_relevant_chunks(self, query: str, db: Session) -> List[Dict]:
         """Retrieve relevant document chunks for a query"""
-        retrieved_chunks = self.retriever.retrieve_with_context(query, db)
+        # Repeated queries skip both the embedding call and the vector search;
+        # the chunk version drops entries cached before a reindex
+        vector_repo = self.retriever.vector_repo
+        cache_key = (
+            query.strip().lower(),
+            vector_repo.top_k,
+            vector_repo.similarity_threshold,
+            await get_chunks_version(),
+        )
+        cached = self.retrieval_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Query: {query} (cached, {len(cached)} chunks)")
+            return list(cached)
+
+        retrieved_chunks = await self.retriever.retrieve_with_context(query, db)
+        self.retrieval_cache.put(cache_key, retrieved_chunks)
 
         logger.info(f"Query: {query}")
         logger.info(f"Retrieved {len(retrieved_chunks)} chunks")
@@ -68,8 +140,10 @@ class AssistantService:
 
     def generate_no_results_message(self, query: str) -> str:
         """Generate a helpful message when no relevant chunks are found"""
-        is_english = any(ord(c) < 128 for c in query) and not any(
-            "\u4e00" <= c <= "\u9fff" for c in query
+        # English if there is any ASCII and no CJK ideograph; both scans
+        # run in the C regex engine and stop at the first match
+        is_english = (
+            _ASCII_RE.search(query) is not None and _CJK_RE.search(query) is None
         )
 
         if is_english:
@@ -120,9 +194,14 @@ Please try rephrasing your question, and I'll do my best to help!"""
         return answer, sources
 
     def format_sources(self, sources: List[Dict]) -> List[Source]:
-        """Format source dictionaries to Source schema objects"""
+        """
+        Format source dictionaries to Source schema objects
+
+        The dicts are built internally by `extract_sources`, so validation
+        is skipped with `model_construct`.
+        """
         return [
-            Source(
+            Source.model_construct(
                 file=s["file"],
                 heading=s["heading"],
                 relevance_score=s["relevance_score"],
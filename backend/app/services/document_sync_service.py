@@ -0,0 +1,118 @@
+"""
+Document sync service - runs directory syncs as background jobs
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+from app.clients import get_redis_client
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.document_repository import DocumentRepository
+
+logger = logging.getLogger(__name__)
+
+# Job records live in Redis so every worker (and a restarted one) sees them
+SYNC_JOB_KEY_PREFIX = "sync_job:"
+
+# Holds the id of the pending/running job; only one sync runs at a time
+ACTIVE_SYNC_JOB_KEY = "sync_job:active"
+
+# Releases the active slot if the worker running a sync dies mid-job
+ACTIVE_SYNC_JOB_TIMEOUT_SECONDS = 3600
+
+
+class DocumentSyncService:
+    """Service for running document directory syncs in the background"""
+
+    def __init__(self):
+        self.redis = get_redis_client()
+
+    async def get_or_create_job(self) -> Tuple[Dict, bool]:
+        """
+        Get the active sync job or register a new one
+
+        Only one sync runs at a time across all workers; concurrent requests
+        share the job that is already pending or running.
+
+        Returns:
+            Tuple of (job, created)
+        """
+        while True:
+            job = {
+                "job_id": uuid4().hex,
+                "status": "pending",
+                "stats": None,
+                "error": None,
+            }
+            # The record is written before the slot is claimed, so whoever
+            # finds the slot taken can always read the job it points to
+            await self._save_job(job)
+
+            claimed = await self.redis.set(
+                ACTIVE_SYNC_JOB_KEY,
+                job["job_id"],
+                nx=True,
+                ex=ACTIVE_SYNC_JOB_TIMEOUT_SECONDS,
+            )
+            if claimed:
+                return job, True
+
+            await self.redis.delete(f"{SYNC_JOB_KEY_PREFIX}{job['job_id']}")
+
+            active_job_id = await self.redis.get(ACTIVE_SYNC_JOB_KEY)
+            if active_job_id:
+                active_job = await self.get_job(active_job_id)
+                if active_job:
+                    return active_job, False
+            # The active job finished in the meantime; try to claim again
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get sync job by ID"""
+        job = await self.redis.get(f"{SYNC_JOB_KEY_PREFIX}{job_id}")
+        return json.loads(job) if job else None
+
+    async def run_sync(self, job_id: str, documents_dir: str) -> None:
+        """
+        Run a sync job with its own database session
+
+        Args:
+            job_id: Job ID returned by get_or_create_job
+            documents_dir: Directory to sync documents from
+        """
+        job = {"job_id": job_id, "status": "running", "stats": None, "error": None}
+        await self._save_job(job)
+        logger.info(f"Document sync job {job_id} started")
+
+        try:
+            job["stats"] = await asyncio.to_thread(self._sync_directory, documents_dir)
+            job["status"] = "completed"
+            logger.info(f"Document sync job {job_id} completed: {job['stats']}")
+        except Exception as e:
+            logger.error(f"Document sync job {job_id} failed: {e}", exc_info=True)
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            await self._save_job(job)
+            if await self.redis.get(ACTIVE_SYNC_JOB_KEY) == job_id:
+                await self.redis.delete(ACTIVE_SYNC_JOB_KEY)
+
+    async def _save_job(self, job: Dict) -> None:
+        """Store a job record; finished jobs expire instead of being pruned"""
+        await self.redis.set(
+            f"{SYNC_JOB_KEY_PREFIX}{job['job_id']}",
+            json.dumps(job),
+            ex=settings.sync_job_ttl_seconds,
+        )
+
+    @staticmethod
+    def _sync_directory(documents_dir: str) -> Dict:
+        """Sync document records with the directory (blocking)"""
+        db = SessionLocal()
+        try:
+            return DocumentRepository(db).sync_documents_from_directory(documents_dir)
+        finally:
+            db.close()
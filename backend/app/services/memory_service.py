@@ -7,18 +7,41 @@ Combines three layers:
 """
 
 import logging
-from datetime import datetime
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any
 
-import tiktoken
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 
 from app.core.config import settings
 from app.models.conversation_memory import ConversationMemory
 from app.services.conversation_summary_service import ConversationSummaryService
+from app.utils.tokenizer import get_tokenizer
 
 logger = logging.getLogger(__name__)
 
+# Message dict key caching its token count (internal, never sent to the LLM)
+TOKEN_COUNT_KEY = "_tok"
+
+# Texts up to this length have their token counts cached (role labels,
+# separators, recurring short utterances); longer ones are always encoded
+TOKEN_COUNT_CACHE_MAX_CHARS = 512
+
+
+@lru_cache(maxsize=4096)
+def _count_tokens_cached(text: str) -> int:
+    """Count tokens of a short text, memoized across calls"""
+    return len(get_tokenizer().encode(text))
+
+
+# Built once so every lookup hits SQLAlchemy's compiled-statement cache
+_SELECT_MEMORY_BY_SESSION = select(ConversationMemory).where(
+    ConversationMemory.session_id == bindparam("session_id")
+)
+
 
 class MemoryService:
     """
@@ -46,7 +69,7 @@ class MemoryService:
 
         # Initialize tokenizer for token counting
         try:
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")  # GPT-4 encoding
+            self.tokenizer = get_tokenizer()  # GPT-4 encoding
         except Exception as e:
             logger.warning(f"Failed to load tiktoken, using approximation: {e}")
             self.tokenizer = None
@@ -62,6 +85,8 @@ class MemoryService:
             Number of tokens
         """
         if self.tokenizer:
+            if len(text) <= TOKEN_COUNT_CACHE_MAX_CHARS:
+                return _count_tokens_cached(text)
             return len(self.tokenizer.encode(text))
         else:
             # Fallback: rough approximation (4 chars ≈ 1 token)
@@ -77,12 +102,53 @@ class MemoryService:
         Returns:
             Total token count
         """
-        total = 0
-        for msg in messages:
-            content = msg.get("content", "")
-            # Add role and formatting overhead (~4 tokens per message)
-            total += self.count_tokens(content) + 4
-        return total
+        return sum(self._ensure_token_counts(messages))
+
+    def count_tokens_batch(self, texts: list[str]) -> list[int]:
+        """
+        Count tokens for several texts in one tokenizer call.
+
+        tiktoken encodes the batch in parallel in Rust, avoiding a
+        Python-to-Rust round trip per text.
+
+        Args:
+            texts: Texts to count tokens for
+
+        Returns:
+            Number of tokens per text, in input order
+        """
+        if self.tokenizer:
+            return [
+                len(tokens)
+                for tokens in self.tokenizer.encode_batch(
+                    texts, num_threads=os.cpu_count()
+                )
+            ]
+        else:
+            # Fallback: rough approximation (4 chars ≈ 1 token)
+            return [len(text) // 4 for text in texts]
+
+    def _ensure_token_counts(self, messages: list[dict[str, Any]]) -> list[int]:
+        """
+        Get per-message token counts, caching them on the messages.
+
+        Counts (content plus ~4 tokens of role/formatting overhead) are
+        stored under TOKEN_COUNT_KEY, so each message is tokenized at most
+        once per request; uncounted messages are encoded in one batch.
+        The key is dropped when LLMClient builds the API messages.
+
+        Args:
+            messages: Conversation messages
+
+        Returns:
+            Token count per message, in input order
+        """
+        missing = [msg for msg in messages if TOKEN_COUNT_KEY not in msg]
+        if missing:
+            contents = [msg.get("content", "") for msg in missing]
+            for msg, count in zip(missing, self.count_tokens_batch(contents)):
+                msg[TOKEN_COUNT_KEY] = count + 4
+        return [msg[TOKEN_COUNT_KEY] for msg in messages]
 
     async def get_memory_context(
         self,
@@ -160,19 +226,23 @@ class MemoryService:
         if not messages:
             return []
 
+        # Tokenize all messages in one batch up front
+        token_counts = self._ensure_token_counts(messages)
+
         # Start from most recent and work backwards
         recent = []
         total_tokens = 0
 
-        for msg in reversed(messages):
-            msg_tokens = self.count_tokens(msg.get("content", "")) + 4
-
+        for msg, msg_tokens in zip(reversed(messages), reversed(token_counts)):
             if total_tokens + msg_tokens > max_tokens:
                 break
 
-            recent.insert(0, msg)
+            recent.append(msg)
             total_tokens += msg_tokens
 
+        # Collected newest-first; restore chronological order once
+        recent.reverse()
+
         # Always include at least the last 2 messages (1 turn)
         if len(recent) < 2 and len(messages) >= 2:
             recent = messages[-2:]
@@ -208,7 +278,7 @@ class MemoryService:
 
         # Update memory record
         memory.summary = new_summary
-        memory.summary_updated_at = datetime.utcnow()
+        memory.summary_updated_at = datetime.now(timezone.utc)
         memory.message_count = len(messages_to_summarize)
 
         self.db.commit()
@@ -233,15 +303,42 @@ class MemoryService:
             key: Memory key (e.g., "project", "user_language")
             value: Value to store
         """
+        self.update_structured_memory_bulk(session_id, {key: value})
+
+    def update_structured_memory_bulk(
+        self,
+        session_id: str,
+        updates: dict[str, Any],
+    ):
+        """
+        Update several structured memory (Layer 3) keys in one commit.
+
+        Keys whose stored value is already equal are skipped, and nothing is
+        written when no value changes.
+
+        Args:
+            session_id: Conversation session ID
+            updates: Memory keys mapped to the values to store
+        """
         memory = self._get_or_create_memory(session_id)
+        structured_data = memory.structured_data or {}
 
-        if not memory.structured_data:
-            memory.structured_data = {}
+        changed = {
+            key: value
+            for key, value in updates.items()
+            if key not in structured_data or structured_data[key] != value
+        }
+        if not changed:
+            return
 
-        memory.structured_data[key] = value
+        structured_data.update(changed)
+        memory.structured_data = structured_data
+        # In-place changes to a JSON column are not tracked automatically
+        flag_modified(memory, "structured_data")
         self.db.commit()
 
-        logger.info(f"Updated structured memory: {key} = {value}")
+        for key, value in changed.items():
+            logger.info(f"Updated structured memory: {key} = {value}")
 
     def _get_or_create_memory(self, session_id: str) -> ConversationMemory:
         """
@@ -253,13 +350,15 @@ class MemoryService:
         Returns:
             ConversationMemory record
         """
-        memory = (
-            self.db.query(ConversationMemory)
-            .filter(ConversationMemory.session_id == session_id)
-            .first()
-        )
+        # session_id is unique, so at most one row matches
+        memory = self.db.execute(
+            _SELECT_MEMORY_BY_SESSION, {"session_id": session_id}
+        ).scalar_one_or_none()
 
         if not memory:
+            # Committed right away: read-only callers such as
+            # get_memory_context never commit, which would otherwise roll the
+            # row back and recreate it on every request
             memory = ConversationMemory(
                 session_id=session_id,
                 summary=None,
@@ -2,20 +2,23 @@
 RAG Service - Consolidates all RAG-related logic including chunking, retrieval, and context formatting
 """
 
-import base64
+import binascii
 import logging
+import math
+import os
 import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
-import tiktoken
 from sqlalchemy.orm import Session
 
-from app.clients import EmbeddingClient
+from app.clients import get_embedding_client
 from app.core import settings
 from app.repositories import VectorRepository
+from app.utils.tokenizer import get_tokenizer
 
 logger = logging.getLogger(__name__)
 
@@ -29,15 +32,37 @@ class ImagePreprocessor:
 
     # Pattern to match base64 image references in markdown
     # Example: [image1]: <data:image/png;base64,iVBORw0KGgoAAAANS...>
+    # The payload group only admits whitespace between base64 runs, and the
+    # pattern is ASCII-only since base64 is
     IMAGE_REF_PATTERN = re.compile(
-        r"\[(image\d+)\]:\s*<data:image\/(png|jpeg|jpg|gif|webp);base64,([A-Za-z0-9+/=\s]+)>",
-        re.MULTILINE,
+        r"\[(image\d+)\]:\s*<data:image\/(png|jpeg|jpg|gif|webp);base64,"
+        r"\s*([A-Za-z0-9+/=]+(?:\s+[A-Za-z0-9+/=]+)*)\s*>",
+        re.MULTILINE | re.ASCII,
     )
 
+    # Deletes whitespace wrapped into base64 payloads
+    _WHITESPACE_TABLE = str.maketrans("", "", " \t\n\r\f\v")
+
+    # Max threads decoding and writing images of one document
+    MAX_WRITE_WORKERS = 8
+
     # Pattern to match image usage in markdown
     # Example: ![][image1]
     IMAGE_USAGE_PATTERN = re.compile(r"!\[\]\[(image\d+)\]")
 
+    # First non-whitespace character of a line that is not an image
+    TEXT_LINE_PATTERN = re.compile(r"^\s*(?!!\[)\S", re.MULTILINE)
+
+    # Everything preprocess_markdown rewrites, matched in a single pass:
+    # runs of reference definitions together with their surrounding
+    # newlines, image usages, and runs of blank lines
+    REWRITE_PATTERN = re.compile(
+        rf"(?P<refs>\n*(?:{IMAGE_REF_PATTERN.pattern}\n*)+)"
+        r"|(?P<usage>!\[\]\[(?P<usage_id>image\d+)\])"
+        r"|(?P<blanks>\n{3,})",
+        re.ASCII,
+    )
+
     def __init__(self, base_dir: str = "uploaded_images"):
         """
         Initialize image preprocessor
@@ -47,6 +72,59 @@ class ImagePreprocessor:
         """
         self.base_dir = base_dir
 
+    def _save_image(
+        self,
+        doc_image_dir: Path,
+        document_id: str,
+        image_id: str,
+        ext: str,
+        base64_str: str,
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Decode a base64 image and save it under the document's image directory
+
+        Args:
+            doc_image_dir: Document-specific image directory
+            document_id: Unique identifier for the document
+            image_id: Image reference id (e.g. image1)
+            ext: Image file extension
+            base64_str: Base64 payload, possibly containing whitespace
+
+        Returns:
+            URL and size in bytes of the saved image, or None if it could
+            not be processed
+        """
+        try:
+            # Remove whitespace from base64 string
+            base64_str = base64_str.translate(self._WHITESPACE_TABLE)
+
+            # Decode base64 to bytes; a2b_base64 reads an ASCII str's
+            # buffer directly, without first encoding it to a bytes copy
+            image_bytes = binascii.a2b_base64(base64_str)
+
+            # Generate unique filename
+            filename = f"{uuid.uuid4()}.{ext}"
+            filepath = doc_image_dir / filename
+
+            # Save image to disk; unbuffered, so the payload is handed
+            # to the OS without an extra copy through a write buffer
+            with open(filepath, "wb", buffering=0) as f:
+                f.write(image_bytes)
+
+            # Per-image detail only at debug level; preprocess_markdown logs
+            # one summary per document
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Saved image {image_id} as {filename} ({len(image_bytes)} bytes)"
+                )
+
+            return f"/images/{document_id}/{filename}", len(image_bytes)
+
+        except Exception as e:
+            logger.error(f"Failed to process image {image_id}: {e}")
+            # Skip this image but continue processing others
+            return None
+
     def preprocess_markdown(self, markdown: str, document_id: str) -> str:
         """
         Extract base64 images from markdown, save as local files, and update references.
@@ -71,66 +149,55 @@ class ImagePreprocessor:
             return markdown
 
         image_map: Dict[str, str] = {}
+        total_bytes = 0
 
         # Create document-specific image directory
         doc_image_dir = Path(self.base_dir) / str(document_id)
         doc_image_dir.mkdir(parents=True, exist_ok=True)
 
-        # Extract and save all base64 images
-        image_count = 0
-        for match in self.IMAGE_REF_PATTERN.finditer(markdown):
-            image_id, ext, base64_str = match.groups()
-
-            try:
-                # Remove whitespace from base64 string
-                base64_str = re.sub(r"\s+", "", base64_str)
-
-                # Decode base64 to bytes
-                image_bytes = base64.b64decode(base64_str)
-
-                # Generate unique filename
-                filename = f"{uuid.uuid4()}.{ext}"
-                filepath = doc_image_dir / filename
-
-                # Save image to disk
-                with open(filepath, "wb") as f:
-                    f.write(image_bytes)
-
-                # Store mapping from image_id to URL
-                image_url = f"/images/{document_id}/{filename}"
-                image_map[image_id] = image_url
-                image_count += 1
-
-                logger.info(
-                    f"Saved image {image_id} as {filename} ({len(image_bytes)} bytes)"
+        # Extract and save all base64 images; file writes release the GIL,
+        # so images are saved in parallel
+        refs = [match.groups() for match in self.IMAGE_REF_PATTERN.finditer(markdown)]
+        if refs:
+            with ThreadPoolExecutor(max_workers=self.MAX_WRITE_WORKERS) as executor:
+                saved = executor.map(
+                    lambda ref: self._save_image(doc_image_dir, document_id, *ref),
+                    refs,
                 )
-
-            except Exception as e:
-                logger.error(f"Failed to process image {image_id}: {e}")
-                # Skip this image but continue processing others
-                continue
-
-        # Remove all base64 reference definitions from markdown
-        markdown = self.IMAGE_REF_PATTERN.sub("", markdown)
-
-        # Replace image usage syntax with proper markdown image links
-        def replace_image(match):
-            image_id = match.group(1)
-            url = image_map.get(image_id, "")
-            if url:
-                return f"![{image_id}]({url})"
-            else:
-                # If image wasn't found/processed, keep original
-                logger.warning(f"Image reference {image_id} not found in map")
-                return match.group(0)
-
-        markdown = self.IMAGE_USAGE_PATTERN.sub(replace_image, markdown)
-
-        # Clean up extra blank lines
-        markdown = re.sub(r"\n{3,}", "\n\n", markdown)
+                for (image_id, _, _), result in zip(refs, saved):
+                    if result is not None:
+                        url, size = result
+                        image_map[image_id] = url
+                        total_bytes += size
+        image_count = len(image_map)
+
+        # Remove reference definitions, link image usages and collapse blank
+        # lines in one pass (the same result as doing them one after another)
+        def rewrite(match):
+            if match.group("refs") is not None:
+                # Only newlines remain once the definitions are dropped;
+                # keep at most one blank line of them
+                newlines = self.IMAGE_REF_PATTERN.sub("", match.group()).count("\n")
+                return "\n" * min(newlines, 2)
+
+            if match.group("usage") is not None:
+                image_id = match.group("usage_id")
+                url = image_map.get(image_id, "")
+                if url:
+                    return f"![{image_id}]({url})"
+                else:
+                    # If image wasn't found/processed, keep original
+                    logger.warning(f"Image reference {image_id} not found in map")
+                    return match.group()
+
+            # Clean up extra blank lines
+            return "\n\n"
+
+        markdown = self.REWRITE_PATTERN.sub(rewrite, markdown)
 
         logger.info(
-            f"Preprocessed markdown: extracted {image_count} images for document {document_id}"
+            f"Preprocessed markdown: saved {image_count} images "
+            f"({total_bytes} bytes) for document {document_id}"
         )
 
         return markdown.strip()
@@ -154,17 +221,10 @@ class ImagePreprocessor:
 
         # Check if chunk starts with image markdown
         if text.startswith("!["):
-            # Check if there's substantial text after the image
-            # Allow for image + caption, but reject standalone images
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-            # If only one line and it's an image, reject
-            if len(lines) == 1:
-                return True
-
-            # If all lines are images, reject
-            if all(line.startswith("![") for line in lines):
-                return True
+            # Allow for image + caption, but reject chunks whose non-blank
+            # lines are all images; the scan stops at the first text line
+            # instead of splitting and stripping the whole chunk
+            return ImagePreprocessor.TEXT_LINE_PATTERN.search(text) is None
 
         return False
 
@@ -182,11 +242,21 @@ class MarkdownChunker:
     ):
         self.chunk_size = chunk_size or settings.chunk_size
         self.chunk_overlap = chunk_overlap or settings.chunk_overlap
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = get_tokenizer()
+        # Tokens added by the "\n\n" joining paragraphs within a chunk
+        self._separator_ids = self.tokenizer.encode_ordinary("\n\n")
+        self._separator_tokens = len(self._separator_ids)
 
-    def _count_tokens(self, text: str) -> int:
-        """Count the number of tokens in text"""
-        return len(self.tokenizer.encode(text))
+    def _encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """
+        Encode many texts in one tiktoken call, parallelized in Rust
+
+        `encode_ordinary` skips special-token scanning; document text never
+        carries special tokens.
+        """
+        if not texts:
+            return []
+        return self.tokenizer.encode_ordinary_batch(texts, num_threads=os.cpu_count())
 
     def chunk_document(self, content: str, source_file: str) -> List[Dict]:
         """
@@ -199,37 +269,104 @@ class MarkdownChunker:
         Returns:
             List of chunks with metadata
         """
-        # Parse document structure
-        sections = self._parse_markdown_structure(content)
+        return self.chunk_documents([(source_file, content)])[0]
 
-        # Create chunks
-        chunks = []
-        chunk_index = 0
+    def chunk_documents(self, documents: List[Tuple[str, str]]) -> List[List[Dict]]:
+        """
+        Chunk several markdown documents, tokenizing them in batches
+
+        Every section of every document is parsed first; section texts are
+        then encoded in one batch call, and the paragraphs of all sections
+        that need splitting in a second one.
+
+        Args:
+            documents: List of (source_file, content) tuples
 
-        for section in sections:
-            section_chunks = self._chunk_section(
-                section["content"], section["heading_path"], source_file, chunk_index
+        Returns:
+            List of chunks with metadata for each document, in input order
+        """
+        # Parse document structure (pure Python, no tokenization yet)
+        doc_sections = [
+            [
+                (section["heading_path"], self._clean_content(section["content"]))
+                for section in self._parse_markdown_structure(content)
+            ]
+            for _, content in documents
+        ]
+        section_texts = [text for sections in doc_sections for _, text in sections]
+        section_token_counts = [len(ids) for ids in self._encode_batch(section_texts)]
+
+        # Only sections over chunk_size are split into paragraphs
+        section_paragraphs = {
+            i: self._split_into_paragraphs(text)
+            for i, (text, token_count) in enumerate(
+                zip(section_texts, section_token_counts)
+            )
+            if token_count > self.chunk_size
+        }
+        paragraph_ids = iter(
+            self._encode_batch(
+                [para for paras in section_paragraphs.values() for para in paras]
             )
-            chunks.extend(section_chunks)
-            chunk_index += len(section_chunks)
+        )
 
-        return chunks
+        # Create chunks
+        results = []
+        section_num = 0
+        for (source_file, _), sections in zip(documents, doc_sections):
+            chunks = []
+            for heading_path, cleaned_content in sections:
+                paragraphs = section_paragraphs.get(section_num)
+                chunks.extend(
+                    self._chunk_section(
+                        cleaned_content,
+                        section_token_counts[section_num],
+                        (
+                            [(para, next(paragraph_ids)) for para in paragraphs]
+                            if paragraphs is not None
+                            else []
+                        ),
+                        heading_path,
+                        source_file,
+                        len(chunks),
+                    )
+                )
+                section_num += 1
+            results.append(chunks)
+
+        return results
 
     def _parse_markdown_structure(self, content: str) -> List[Dict]:
         """Parse markdown into hierarchical sections"""
         lines = content.split("\n")
         sections = []
-        current_section = {"heading_path": "", "content": "", "level": 0}
         heading_stack = []
 
+        # Lines are collected per section and joined once, rather than
+        # growing the section string line by line
+        heading_path = ""
+        level = 0
+        section_lines = []
+
+        def add_section():
+            section_content = "\n".join(section_lines) + "\n"
+            # Save section if it has content
+            if section_content.strip():
+                sections.append(
+                    {
+                        "heading_path": heading_path,
+                        "content": section_content,
+                        "level": level,
+                    }
+                )
+
         for line in lines:
             # Check if line is a heading
             heading_match = re.match(r"^(#{1,6})\s+(.+)$", line)
 
             if heading_match:
-                # Save previous section if it has content
-                if current_section["content"].strip():
-                    sections.append(current_section.copy())
+                # Save previous section
+                add_section()
 
                 # Parse new heading
                 level = len(heading_match.group(1))
@@ -239,28 +376,42 @@ class MarkdownChunker:
                 heading_stack = heading_stack[: level - 1]
                 heading_stack.append(heading_text)
 
-                # Start new section
-                current_section = {
-                    "heading_path": " > ".join(heading_stack),
-                    "content": f"{'#' * level} {heading_text}\n\n",
-                    "level": level,
-                }
+                # Start new section: heading line followed by a blank line
+                heading_path = " > ".join(heading_stack)
+                section_lines = [f"{'#' * level} {heading_text}", ""]
             else:
                 # Add line to current section
-                current_section["content"] += line + "\n"
+                section_lines.append(line)
 
         # Add last section
-        if current_section["content"].strip():
-            sections.append(current_section)
+        add_section()
 
         return sections
 
     def _chunk_section(
-        self, content: str, heading_path: str, source_file: str, start_index: int
+        self,
+        cleaned_content: str,
+        content_token_count: int,
+        paragraphs: List[Tuple[str, List[int]]],
+        heading_path: str,
+        source_file: str,
+        start_index: int,
     ) -> List[Dict]:
-        """Chunk a section into smaller pieces"""
-        cleaned_content = self._clean_content(content)
-        content_token_count = self._count_tokens(cleaned_content)
+        """
+        Chunk a section into smaller pieces
+
+        Args:
+            cleaned_content: Cleaned section text
+            content_token_count: Token count of cleaned_content
+            paragraphs: (paragraph, token ids) pairs; only used when the
+                section exceeds chunk_size
+            heading_path: Heading hierarchy path
+            source_file: Name of the source file
+            start_index: Chunk index of the first chunk
+
+        Returns:
+            List of chunks with metadata
+        """
 
         # If section is small enough, return as single chunk
         if content_token_count <= self.chunk_size:
@@ -279,41 +430,42 @@ class MarkdownChunker:
 
         # Split into chunks with overlap
         chunks = []
-        paragraphs = self._split_into_paragraphs(cleaned_content)
 
-        current_chunk = ""
+        # Pieces of the current chunk, joined with "\n\n" only when the
+        # chunk is emitted instead of growing a string per paragraph
+        current_parts = []
+        # Token ids of the current chunk, carried forward from the paragraph
+        # encodings so chunks are never re-encoded for counts or overlap
+        current_ids = []
         current_index = start_index
 
-        for para in paragraphs:
-            # Calculate token counts
-            current_tokens = self._count_tokens(current_chunk)
-            para_tokens = self._count_tokens(para)
+        for para, para_ids in paragraphs:
+            para_tokens = len(para_ids)
 
             # If paragraph itself is larger than chunk_size, force split it
             if para_tokens > self.chunk_size:
                 # Save current chunk if it has content
-                if current_chunk.strip():
+                chunk_text = "\n\n".join(current_parts).strip()
+                if chunk_text:
                     chunks.append(
                         {
-                            "content": current_chunk.strip(),
+                            "content": chunk_text,
                             "source_file": source_file,
                             "heading_path": heading_path,
                             "chunk_index": current_index,
                             "metadata": {
-                                "token_count": self._count_tokens(
-                                    current_chunk.strip()
-                                ),
+                                "token_count": self._stripped_token_count(current_ids),
                                 "is_complete_section": False,
                             },
                         }
                     )
                     current_index += 1
-                    current_chunk = ""
+                current_parts = []
+                current_ids = []
 
                 # Split the large paragraph into multiple chunks
-                tokens = self.tokenizer.encode(para)
-                for i in range(0, len(tokens), self.chunk_size - self.chunk_overlap):
-                    sub_tokens = tokens[i : i + self.chunk_size]
+                for i in range(0, len(para_ids), self.chunk_size - self.chunk_overlap):
+                    sub_tokens = para_ids[i : i + self.chunk_size]
                     sub_text = self.tokenizer.decode(sub_tokens)
 
                     chunks.append(
@@ -332,39 +484,51 @@ class MarkdownChunker:
                     current_index += 1
                 continue
 
-            # If adding this paragraph exceeds chunk size
-            if current_tokens + para_tokens > self.chunk_size and current_chunk:
+            # If adding this paragraph (and its separator) exceeds chunk size
+            if (
+                current_parts
+                and len(current_ids) + self._separator_tokens + para_tokens
+                > self.chunk_size
+            ):
                 # Save current chunk
+                chunk_text = "\n\n".join(current_parts).strip()
                 chunks.append(
                     {
-                        "content": current_chunk.strip(),
+                        "content": chunk_text,
                         "source_file": source_file,
                         "heading_path": heading_path,
                         "chunk_index": current_index,
                         "metadata": {
-                            "token_count": self._count_tokens(current_chunk.strip()),
+                            "token_count": self._stripped_token_count(current_ids),
                             "is_complete_section": False,
                         },
                     }
                 )
 
                 # Start new chunk with overlap
-                overlap_text = self._get_overlap_text(current_chunk)
-                current_chunk = overlap_text + para + "\n\n"
+                overlap_text, overlap_ids = self._get_overlap_text(
+                    current_ids, chunk_text
+                )
+                current_parts = [overlap_text, para]
+                current_ids = overlap_ids + self._separator_ids + para_ids
                 current_index += 1
             else:
-                current_chunk += para + "\n\n"
+                if current_parts:
+                    current_ids.extend(self._separator_ids)
+                current_parts.append(para)
+                current_ids.extend(para_ids)
 
         # Add last chunk
-        if current_chunk.strip():
+        chunk_text = "\n\n".join(current_parts).strip()
+        if chunk_text:
             chunks.append(
                 {
-                    "content": current_chunk.strip(),
+                    "content": chunk_text,
                     "source_file": source_file,
                     "heading_path": heading_path,
                     "chunk_index": current_index,
                     "metadata": {
-                        "token_count": self._count_tokens(current_chunk.strip()),
+                        "token_count": self._stripped_token_count(current_ids),
                         "is_complete_section": False,
                     },
                 }
@@ -372,6 +536,25 @@ class MarkdownChunker:
 
         return chunks
 
+    def _stripped_token_count(self, ids: List[int]) -> int:
+        """
+        Count chunk tokens without the whitespace-only tokens at either end
+
+        Mirrors the strip() applied to emitted chunk text, e.g. separator ids
+        leading an overlap slice. A token that merely starts with whitespace
+        is still counted, so the count can run a token above a fresh encoding.
+        """
+
+        def is_space(token_id: int) -> bool:
+            return self.tokenizer.decode_single_token_bytes(token_id).isspace()
+
+        start, end = 0, len(ids)
+        while start < end and is_space(ids[start]):
+            start += 1
+        while end > start and is_space(ids[end - 1]):
+            end -= 1
+        return end - start
+
     def _clean_content(self, content: str) -> str:
         """Clean and normalize content"""
         # Remove TOC markers
@@ -387,27 +570,39 @@ class MarkdownChunker:
 
     def _split_into_paragraphs(self, content: str) -> List[str]:
         """Split content into paragraphs"""
-        # Split by double newlines
-        paragraphs = re.split(r"\n\n+", content)
+        # Content comes from _clean_content, which already collapsed runs of
+        # blank lines, so paragraphs are separated by exactly two newlines
+        paragraphs = content.split("\n\n")
 
         # Filter out empty paragraphs
         paragraphs = [p.strip() for p in paragraphs if p.strip()]
 
         return paragraphs
 
-    def _get_overlap_text(self, text: str) -> str:
-        """Get overlap text from the end of current chunk using token-based extraction"""
-        tokens = self.tokenizer.encode(text)
+    def _get_overlap_text(self, tokens: List[int], text: str) -> Tuple[str, List[int]]:
+        """
+        Get overlap text from the end of current chunk using token-based extraction
+
+        The overlap is sliced from the carried paragraph ids rather than a
+        fresh encoding of the chunk text, so its start can shift by a
+        character and it joins the next paragraph with a single "\n\n".
+
+        Args:
+            tokens: Token ids of the chunk
+            text: Chunk text
 
+        Returns:
+            Overlap text and its token ids
+        """
         # If text is shorter than overlap, return entire text
         if len(tokens) <= self.chunk_overlap:
-            return text
+            return text, list(tokens)
 
         # Extract last N tokens for overlap
         overlap_tokens = tokens[-self.chunk_overlap :]
         overlap_text = self.tokenizer.decode(overlap_tokens)
 
-        return overlap_text + "\n\n"
+        return overlap_text, overlap_tokens
 
 
 def chunk_documents(
@@ -427,14 +622,18 @@ def chunk_documents(
     image_preprocessor = ImagePreprocessor()
     all_chunks = []
 
+    # Preprocess markdown to extract base64 images
+    preprocessed = []
     for filename, content in documents:
-        # Preprocess markdown to extract base64 images
         if document_id_map and filename in document_id_map:
             document_id = document_id_map[filename]
             content = image_preprocessor.preprocess_markdown(content, document_id)
+        preprocessed.append((filename, content))
 
-        chunks = chunker.chunk_document(content, filename)
-
+    # Tokenize all documents together
+    for (filename, _), chunks in zip(
+        preprocessed, chunker.chunk_documents(preprocessed)
+    ):
         # Filter out image-only chunks
         chunks = [
             chunk
@@ -464,7 +663,7 @@ class VectorRetriever:
         mmr_lambda: Optional[float] = None,
         mmr_fetch_k: Optional[int] = None,
     ):
-        self.embedding_client = EmbeddingClient()
+        self.embedding_client = get_embedding_client()
         self.vector_repo = VectorRepository(
             top_k if top_k is not None else settings.top_k_results,
             (
@@ -479,7 +678,7 @@ class VectorRetriever:
             mmr_fetch_k if mmr_fetch_k is not None else settings.mmr_fetch_k
         )
 
-    def retrieve(self, query: str, db: Session) -> List[Dict]:
+    async def retrieve(self, query: str, db: Session) -> List[Dict]:
         """
         Retrieve most relevant chunks for a query
 
@@ -491,14 +690,14 @@ class VectorRetriever:
             List of chunk dictionaries with similarity scores
         """
         # Generate query embedding
-        query_embedding = self.embedding_client.generate_embedding(query)
+        query_embedding = await self.embedding_client.agenerate_embedding(query)
 
         if self.use_mmr:
             return self._retrieve_with_mmr(query_embedding, db)
         else:
             return self._retrieve_direct(query_embedding, db)
 
-    def _retrieve_direct(self, query_embedding: List[float], db: Session) -> List[Dict]:
+    def _retrieve_direct(self, query_embedding: np.ndarray, db: Session) -> List[Dict]:
         """Direct vector similarity retrieval without MMR"""
         # Search similar chunks
         chunks_with_scores = self.vector_repo.search_similar_chunks(query_embedding, db)
@@ -519,7 +718,7 @@ class VectorRetriever:
         return results
 
     def _retrieve_with_mmr(
-        self, query_embedding: List[float], db: Session
+        self, query_embedding: np.ndarray, db: Session
     ) -> List[Dict]:
         """
         Retrieve chunks using Maximal Marginal Relevance (MMR) algorithm
@@ -544,18 +743,12 @@ class VectorRetriever:
         Returns:
             List of chunk dictionaries selected by MMR
         """
-        # Step 1: Fetch more candidates than we need (fetch_k candidates)
-        # Temporarily override top_k to fetch more candidates
-        original_top_k = self.vector_repo.top_k
-        self.vector_repo.top_k = self.mmr_fetch_k
-
-        candidates_with_scores = self.vector_repo.search_similar_chunks(
-            query_embedding, db
+        # Step 1: Fetch more candidates than we need (fetch_k candidates),
+        # with their embeddings loaded in the same query
+        candidates_with_scores = self.vector_repo.search_candidates_with_embeddings(
+            query_embedding, db, self.mmr_fetch_k
         )
 
-        # Restore original top_k
-        self.vector_repo.top_k = original_top_k
-
         if not candidates_with_scores:
             return []
 
@@ -580,54 +773,62 @@ class VectorRetriever:
                 }
             )
             query_similarities.append(score)
-            embeddings.append(chunk.embedding)
+            embeddings.append(chunk.embedding.to_numpy())
 
         # Check if we have any valid candidates
         if not candidates:
             return []
 
+        target_k = min(self.vector_repo.top_k, len(candidates))
+
+        # Every candidate would be selected, so there is nothing to diversify;
+        # candidates are already ordered by similarity to the query
+        if target_k == len(candidates):
+            return candidates
+
         # Convert to numpy arrays for efficient computation
-        candidate_embeddings = np.array(embeddings)
+        # float32: NumPy has no BLAS kernels for the stored float16
+        candidate_embeddings = np.asarray(embeddings, dtype=np.float32)
         query_sims = np.array(query_similarities)
 
         # Cosine similarity computation
-        # Pre-compute similarity matrix: similarity_matrix[i][j] = similarity between candidate i and j
-        norms = np.linalg.norm(candidate_embeddings, axis=1, keepdims=True)
-        norms[norms == 0] = 1  # Avoid division by zero
-        normalized_embeddings = candidate_embeddings / norms
-        similarity_matrix = normalized_embeddings @ normalized_embeddings.T
+        # Embeddings are stored L2-normalized (see EmbeddingClient), so dot
+        # products are cosine similarities. Only the rows of the similarity
+        # matrix for selected chunks are needed, so they are computed on
+        # selection rather than all n x n
 
         # Step 2: Apply MMR selection
         selected_indices = []
-        remaining_indices = list(range(len(candidates)))
+        selected_mask = np.zeros(len(candidates), dtype=bool)
 
         # Select first chunk: most similar to query
         first_idx = int(np.argmax(query_sims))
         selected_indices.append(first_idx)
-        remaining_indices.remove(first_idx)
-
-        # Step 3: Iteratively select remaining chunks
-        target_k = min(original_top_k, len(candidates))
-
-        while len(selected_indices) < target_k and remaining_indices:
-            mmr_scores = []
+        selected_mask[first_idx] = True
 
-            for idx in remaining_indices:
-                similarity_to_query = query_sims[idx]
+        # Maximum similarity of every candidate to any selected chunk,
+        # updated with one row per selection instead of recomputed per round
+        max_sim_to_selected = np.full(len(candidates), -np.inf, dtype=np.float32)
+        last_idx = first_idx
 
-                # Get maximum similarity to any selected chunk
-                max_sim_to_selected = np.max(similarity_matrix[idx, selected_indices])
+        # Step 3: Iteratively select remaining chunks
+        while len(selected_indices) < target_k:
+            # Similarities of all candidates to the last selected chunk
+            np.maximum(
+                max_sim_to_selected,
+                candidate_embeddings @ candidate_embeddings[last_idx],
+                out=max_sim_to_selected,
+            )
 
-                # Calculate MMR score
-                mmr_score = self._calculate_mmr_score(
-                    similarity_to_query, max_sim_to_selected
-                )
-                mmr_scores.append((idx, mmr_score))
+            # MMR scores of all candidates at once; selected ones are excluded
+            mmr_scores = self._calculate_mmr_score(query_sims, max_sim_to_selected)
+            mmr_scores[selected_mask] = -np.inf
 
-            # Select chunk with highest MMR score
-            best_idx, best_score = max(mmr_scores, key=lambda x: x[1])
+            # Select chunk with highest MMR score (first one on ties)
+            best_idx = int(np.argmax(mmr_scores))
             selected_indices.append(best_idx)
-            remaining_indices.remove(best_idx)
+            selected_mask[best_idx] = True
+            last_idx = best_idx
 
         # Return selected chunks in order of selection
         results = [candidates[idx] for idx in selected_indices]
@@ -635,11 +836,15 @@ class VectorRetriever:
         return results
 
     def _calculate_mmr_score(
-        self, similarity_to_query: float, max_sim_to_selected: float
-    ) -> float:
+        self,
+        similarity_to_query: Union[float, np.ndarray],
+        max_sim_to_selected: Union[float, np.ndarray],
+    ) -> Union[float, np.ndarray]:
         """
         Calculate MMR (Maximal Marginal Relevance) score
 
+        Works element-wise on arrays, scoring all candidates in one call.
+
         MMR formula: λ * relevance - (1-λ) * redundancy
         - λ (lambda): Trade-off parameter (0 to 1)
           - Higher λ: Prioritize relevance to query
@@ -650,7 +855,7 @@ class VectorRetriever:
             max_sim_to_selected: Maximum similarity to already selected chunks
 
         Returns:
-            MMR score
+            MMR score (an array when given arrays)
         """
         return (
             self.mmr_lambda * similarity_to_query
@@ -682,16 +887,16 @@ class VectorRetriever:
         if vec1.size == 0 or vec2.size == 0:
             return 0.0
 
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+        # Product of norms from squared norms with a single scalar sqrt,
+        # skipping np.linalg.norm's generic dispatch
+        denominator = math.sqrt(np.vdot(vec1, vec1) * np.vdot(vec2, vec2))
 
-        if norm1 == 0 or norm2 == 0:
+        if denominator == 0:
             return 0.0
 
-        return float(dot_product / (norm1 * norm2))
+        return float(np.dot(vec1, vec2) / denominator)
 
-    def retrieve_with_context(
+    async def retrieve_with_context(
         self, query: str, db: Session, include_adjacent: bool = False
     ) -> List[Dict]:
         """
@@ -705,7 +910,7 @@ class VectorRetriever:
         Returns:
             List of chunk dictionaries with metadata
         """
-        return self.retrieve(query, db)
+        return await self.retrieve(query, db)
 
 
 # ============================================================================
@@ -729,17 +934,14 @@ def format_context_for_llm(chunks: List[Dict]) -> str:
     context_parts = []
 
     for i, chunk in enumerate(chunks, 1):
-        source = chunk["source_file"]
         heading = chunk.get("heading_path", "").strip()
-        content = chunk["content"]
-        score = chunk["similarity_score"]
-
-        context_part = f"[來源 {i}] {source}"
-        if heading:
-            context_part += f" - {heading}"
-        context_part += f" (相似度: {score:.2f})\n{content}\n"
+        heading_part = f" - {heading}" if heading else ""
 
-        context_parts.append(context_part)
+        # Each part is built by a single f-string, without += copies
+        context_parts.append(
+            f"[來源 {i}] {chunk['source_file']}{heading_part}"
+            f" (相似度: {chunk['similarity_score']:.2f})\n{chunk['content']}\n"
+        )
 
     return "\n---\n\n".join(context_parts)
 
@@ -758,13 +960,13 @@ def extract_sources(chunks: List[Dict]) -> List[Dict]:
     seen_sources = set()
 
     for chunk in chunks:
-        source_key = f"{chunk['source_file']}::{chunk.get('heading_path', '')}"
+        # Tuple key: hashed directly, no joined string per chunk
+        source_key = (chunk["source_file"], chunk.get("heading_path", ""))
 
         if source_key not in seen_sources:
             # Get a preview of the content (first 150 chars)
-            preview = chunk["content"][:150]
-            if len(chunk["content"]) > 150:
-                preview += "..."
+            content = chunk["content"]
+            preview = content[:150] + ("..." if len(content) > 150 else "")
 
             sources.append(
                 {
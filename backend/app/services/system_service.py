@@ -1,18 +1,44 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.clients import EmbeddingClient
+from app.clients import get_embedding_client
 from app.core import DatabaseUnavailableError, settings
 from app.models import DocumentChunk
 from app.repositories.document_repository import DocumentRepository
+from app.repositories.vector_repository import (
+    VectorRepository,
+    bump_chunks_version,
+)
 from app.services.rag_service import chunk_documents
 
 logger = logging.getLogger(__name__)
 
+# Max threads reading document files; reads release the GIL, so overlapping
+# them hides disk / network filesystem latency
+MAX_READ_WORKERS = 16
+
+
+def _read_document(path) -> Tuple[Optional[str], Optional[Exception]]:
+    """Read a document file, returning its content or the error raised"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read(), None
+    except Exception as e:
+        return None, e
+
+
+def _read_documents(paths: List) -> List[Tuple[Optional[str], Optional[Exception]]]:
+    """Read document files concurrently, in input order"""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(paths))) as executor:
+        return list(executor.map(_read_document, paths))
+
 
 class SystemService:
     """Service for handling system-related business logic"""
@@ -40,40 +66,43 @@ class SystemService:
         """Load all markdown documents from directory"""
         documents = []
 
-        for md_file in documents_dir.glob("*.md"):
-            try:
-                with open(md_file, "r", encoding="utf-8") as f:
-                    content = f.read()
+        entries = list(DocumentRepository.iter_markdown_files(documents_dir))
+        results = _read_documents([entry.path for entry in entries])
 
-                if content.strip():
-                    documents.append((md_file.name, content))
-                    logger.info(f"Loaded {md_file.name}")
-                else:
-                    logger.warning(f"Skipped empty file: {md_file.name}")
-
-            except Exception as e:
-                logger.error(f"Error loading {md_file.name}: {e}")
+        for entry, (content, error) in zip(entries, results):
+            if error is not None:
+                logger.error(f"Error loading {entry.name}: {error}")
+            elif content.strip():
+                documents.append((entry.name, content))
+                logger.info(f"Loaded {entry.name}")
+            else:
+                logger.warning(f"Skipped empty file: {entry.name}")
 
         return documents
 
     def get_database_stats(self, db: Session) -> Dict:
         """Get database statistics"""
-        # Get total chunks count
-        total_chunks = db.query(DocumentChunk).count()
-
-        # Get chunks per file
-        result = db.execute(
-            text(
-                """
-            SELECT source_file, COUNT(*) as count
+        # Chunks per file, with the overall total as a window sum over the
+        # groups so one round-trip serves both
+        rows = (
+            db.execute(
+                text(
+                    """
+            SELECT source_file, COUNT(*) AS count, SUM(COUNT(*)) OVER () AS total
             FROM document_chunks
             GROUP BY source_file
             ORDER BY count DESC
         """
+                )
             )
+            .mappings()
+            .all()
         )
 
-        files_stats = [{"file": row.source_file, "chunks": row.count} for row in result]
+        total_chunks = int(rows[0]["total"]) if rows else 0
+        files_stats = [
+            {"file": row["source_file"], "chunks": row["count"]} for row in rows
+        ]
 
         return {
             "total_chunks": total_chunks,
@@ -81,7 +110,9 @@ class SystemService:
             "files": files_stats,
         }
 
-    def trigger_selective_reindex(self, db: Session, filenames: List[str]) -> Dict:
+    async def trigger_selective_reindex(
+        self, db: Session, filenames: List[str]
+    ) -> Dict:
         """
         Reindex specific documents
 
@@ -107,37 +138,31 @@ class SystemService:
                 }
 
             repo = DocumentRepository(db)
-            reindexed = 0
             failed = []
             failed_files = []
 
             # Load and process each document
             documents_to_process = []
 
-            for filename in filenames:
-                file_path = documents_dir / filename
+            # Open directly instead of stat-ing first; a missing file
+            # surfaces as FileNotFoundError
+            results = _read_documents(
+                [documents_dir / filename for filename in filenames]
+            )
 
-                if not file_path.exists():
-                    logger.warning(f"File not found: {filename}")
-                    failed.append(filename)
-                    failed_files.append(filename)
+            for filename, (content, error) in zip(filenames, results):
+                if error is None and content.strip():
+                    documents_to_process.append((filename, content))
                     continue
 
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-
-                    if content.strip():
-                        documents_to_process.append((filename, content))
-                    else:
-                        logger.warning(f"Skipped empty file: {filename}")
-                        failed.append(filename)
-                        failed_files.append(filename)
-
-                except Exception as e:
-                    logger.error(f"Error loading {filename}: {e}")
-                    failed.append(filename)
-                    failed_files.append(filename)
+                if error is None:
+                    logger.warning(f"Skipped empty file: {filename}")
+                elif isinstance(error, FileNotFoundError):
+                    logger.warning(f"File not found: {filename}")
+                else:
+                    logger.error(f"Error loading {filename}: {error}")
+                failed.append(filename)
+                failed_files.append(filename)
 
             if not documents_to_process:
                 return {
@@ -147,54 +172,92 @@ class SystemService:
                     "failed_files": failed_files,
                 }
 
-            # Delete existing chunks for these documents
+            # Delete existing chunks for these documents; left uncommitted so
+            # the delete and the new chunks land in one transaction
             logger.info(
                 f"Deleting existing chunks for {len(documents_to_process)} documents..."
             )
-            for filename, _ in documents_to_process:
-                db.query(DocumentChunk).filter(
-                    DocumentChunk.source_file == filename
-                ).delete()
-            db.commit()
+            db.query(DocumentChunk).filter(
+                DocumentChunk.source_file.in_(
+                    [filename for filename, _ in documents_to_process]
+                )
+            ).delete(synchronize_session=False)
+
+            # Fetch all document records at once
+            documents = repo.get_documents_by_filenames(
+                [filename for filename, _ in documents_to_process]
+            )
 
             # Create document_id mapping for image storage
-            document_id_map = {}
-            for filename, _ in documents_to_process:
-                doc = repo.get_document_by_filename(filename)
-                if doc:
-                    document_id_map[filename] = str(doc.id)
+            document_id_map = {doc.filename: str(doc.id) for doc in documents}
 
             # Chunk documents with image preprocessing
             logger.info(f"Chunking {len(documents_to_process)} documents...")
             chunks = chunk_documents(documents_to_process, document_id_map)
             logger.info(f"Created {len(chunks)} chunks")
 
-            # Generate embeddings
+            # Generate embeddings and store them in database batch by batch,
+            # so only one batch of vectors is held in memory at a time. A batch
+            # spans `embedding_concurrency` API requests, keeping them all in
+            # flight.
             logger.info("Generating embeddings...")
-            embedder = EmbeddingClient()
-            chunk_texts = [chunk["content"] for chunk in chunks]
-            embeddings = embedder.generate_embeddings_batch(chunk_texts)
-
-            # Store in database
-            for chunk, embedding in zip(chunks, embeddings):
-                db_chunk = DocumentChunk(
-                    content=chunk["content"],
-                    embedding=embedding,
-                    source_file=chunk["source_file"],
-                    heading_path=chunk.get("heading_path"),
-                    chunk_index=chunk["chunk_index"],
-                    chunk_metadata=chunk.get("metadata"),
+            embedder = get_embedding_client()
+            vector_repo = VectorRepository()
+            stream_batch_size = (
+                settings.embedding_batch_size * settings.embedding_concurrency
+            )
+
+            # Chunk fields as parallel columns, extracted once; the embedding
+            # call takes content slices directly and insert rows are zipped
+            # from column slices
+            contents = [chunk["content"] for chunk in chunks]
+            source_files = [chunk["source_file"] for chunk in chunks]
+            heading_paths = [chunk.get("heading_path") for chunk in chunks]
+            chunk_indexes = [chunk["chunk_index"] for chunk in chunks]
+            metadatas = [chunk.get("metadata") for chunk in chunks]
+
+            for start in range(0, len(chunks), stream_batch_size):
+                end = start + stream_batch_size
+                embeddings = await embedder.generate_embeddings_batch(
+                    contents[start:end]
+                )
+                vector_repo.add_chunks_no_return(
+                    [
+                        {
+                            "content": content,
+                            "embedding": embedding,
+                            "source_file": source_file,
+                            "heading_path": heading_path,
+                            "chunk_index": chunk_index,
+                            "chunk_metadata": metadata,
+                        }
+                        for (
+                            content,
+                            embedding,
+                            source_file,
+                            heading_path,
+                            chunk_index,
+                            metadata,
+                        ) in zip(
+                            contents[start:end],
+                            embeddings,
+                            source_files[start:end],
+                            heading_paths[start:end],
+                            chunk_indexes[start:end],
+                            metadatas[start:end],
+                        )
+                    ],
+                    db,
                 )
-                db.add(db_chunk)
 
+            # Committed once with the delete above, so a failed batch rolls
+            # back to the old chunks instead of leaving a partial index
             db.commit()
+            await bump_chunks_version()
 
             # Update document status
-            for filename, _ in documents_to_process:
-                doc = repo.get_document_by_filename(filename)
-                if doc:
-                    repo.mark_as_indexed(doc)
-                reindexed += 1
+            repo.mark_many_as_indexed(documents)
+            reindexed = len(documents_to_process)
 
             logger.info(
                 f"Successfully reindexed {reindexed} documents with {len(chunks)} chunks"
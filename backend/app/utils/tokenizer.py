@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+import tiktoken
+
+# Encoding used for all token counting (GPT-4 / text-embedding-3)
+ENCODING_NAME = "cl100k_base"
+
+
+@lru_cache
+def get_tokenizer() -> tiktoken.Encoding:
+    """
+    Get the shared tiktoken encoder
+
+    Encoders are immutable and thread-safe, so one instance serves every
+    service. It is loaded on first use rather than at import, because the
+    BPE file may have to be downloaded.
+    """
+    return tiktoken.get_encoding(ENCODING_NAME)
@@ -5,7 +5,7 @@ CREATE EXTENSION IF NOT EXISTS vector;
 CREATE TABLE IF NOT EXISTS document_chunks (
     id SERIAL PRIMARY KEY,
     content TEXT NOT NULL,
-    embedding VECTOR(1536) NOT NULL,
+    embedding HALFVEC(1536) NOT NULL,
     source_file VARCHAR(255) NOT NULL,
     heading_path TEXT,
     chunk_index INTEGER,
@@ -17,4 +17,4 @@ CREATE TABLE IF NOT EXISTS document_chunks (
 CREATE INDEX IF NOT EXISTS idx_source_file ON document_chunks(source_file);
 CREATE INDEX IF NOT EXISTS document_chunks_embedding_idx 
     ON document_chunks 
-    USING hnsw (embedding vector_cosine_ops);
+    USING hnsw (embedding halfvec_cosine_ops);
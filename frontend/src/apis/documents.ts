@@ -1,23 +1,45 @@
 import { request } from '../request';
 
+const SYNC_POLL_INTERVAL_MS = 500;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 export const documentsApi = {
-  // Get all documents with optional status filter
+  // Get all documents with optional status filter (follows the paged listing)
   getDocuments: async (statusFilter = null) => {
     const params = statusFilter ? { status_filter: statusFilter } : {};
-    const response = await request.get('/api/documents', { params });
-    return response.data;
+    let { data } = await request.get('/api/documents', { params });
+    const documents = [...data.documents];
+    while (data.next_cursor) {
+      ({ data } = await request.get('/api/documents', {
+        params: { ...params, after: data.next_cursor },
+      }));
+      documents.push(...data.documents);
+    }
+    return { ...data, documents };
   },
 
-  // Get document detail with content
+  // Get document detail with content (metadata and raw file are separate endpoints)
   getDocument: async (filename) => {
-    const response = await request.get(`/api/documents/${encodeURIComponent(filename)}`);
-    return response.data;
+    const path = `/api/documents/${encodeURIComponent(filename)}`;
+    const [meta, content] = await Promise.all([
+      request.get(path),
+      request.get(`${path}/content`, { responseType: 'text' }),
+    ]);
+    return { ...meta.data, content: content.data };
   },
 
-  // Sync documents from directory
+  // Sync documents from directory (runs as a background job; polls until done)
   syncDocuments: async () => {
-    const response = await request.post('/api/documents/sync');
-    return response.data;
+    let { data: job } = await request.post('/api/documents/sync');
+    while (job.status === 'pending' || job.status === 'running') {
+      await sleep(SYNC_POLL_INTERVAL_MS);
+      ({ data: job } = await request.get(`/api/documents/sync/${job.job_id}`));
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Sync failed');
+    }
+    return job;
   },
 
   // Reindex specific documents